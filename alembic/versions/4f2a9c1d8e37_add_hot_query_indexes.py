@@ -0,0 +1,38 @@
+"""add hot query indexes
+
+Revision ID: 4f2a9c1d8e37
+Revises: 103c81c2bbf7
+Create Date: 2026-01-12 18:42:10.517204
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4f2a9c1d8e37"
+down_revision: str | Sequence[str] | None = "103c81c2bbf7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+INDEXES = [
+    ("ix_cards_deck_id_next_review", "cards", ["deck_id", "next_review"]),
+    ("ix_decks_user_id_created_at", "decks", ["user_id", "created_at"]),
+    ("ix_statistics_user_id_session_date", "statistics", ["user_id", "session_date"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
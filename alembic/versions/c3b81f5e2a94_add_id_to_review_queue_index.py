@@ -0,0 +1,46 @@
+"""add id to review queue index
+
+Revision ID: c3b81f5e2a94
+Revises: 75e9cf60e9c2
+Create Date: 2026-10-18 20:12:31.208114
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3b81f5e2a94"
+down_revision: str | Sequence[str] | None = "75e9cf60e9c2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Review sessions page through due cards by (next_review, id), the index has to cover the whole key
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_cards_deck_id_next_review_id",
+            "cards",
+            ["deck_id", "next_review", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index("ix_cards_deck_id_next_review", table_name="cards", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_cards_deck_id_next_review",
+            "cards",
+            ["deck_id", "next_review"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_cards_deck_id_next_review_id", table_name="cards", postgresql_concurrently=True, if_exists=True
+        )
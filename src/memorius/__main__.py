@@ -1,80 +1,125 @@
 import asyncio
 import logging
+from functools import partial
+from pathlib import Path
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.client.session.aiohttp import AiohttpSession
-from fluent_compiler.bundle import FluentBundle
-from fluentogram import FluentTranslator, TranslatorHub
+from aiogram.fsm.storage.memory import MemoryStorage
 
 from memorius.config import settings
-from memorius.database.database import async_session_maker
+from memorius.database.database import async_session_maker, engine
+from memorius.database.deadlines import poll_deadlines
+from memorius.database.pool import monitor_pool
+from memorius.database.review_log import review_log_buffer
+from memorius.database.storage import PostgresStorage, purge_states
 from memorius.handlers import router as main_router
+from memorius.handlers.user.session import expire_deadline, timeout_wheel
+from memorius.i18n import LazyTranslatorHub
+from memorius.middlewares.callbacks import CallbackDataMiddleware
 from memorius.middlewares.database import DatabaseMiddleware
+from memorius.middlewares.fsm import BufferedStateMiddleware
+from memorius.middlewares.menu import MenuMiddleware
+from memorius.middlewares.throttling import ThrottlingRequestMiddleware
 from memorius.middlewares.translate import TranslateMiddleware
+from memorius.utils import build_callback_index, build_menu_index, event_isolation
+from memorius.webhook import run_webhook
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
-translator_hub = TranslatorHub(
+translator_hub = LazyTranslatorHub(
     locales_map={
         "ru": ("ru", "en"),  # Russian with English fallback
         "en": ("en",),  # English only
     },
-    translators=[
-        FluentTranslator(
-            locale="ru",
-            translator=FluentBundle.from_files(
-                locale="ru-RU",
-                filenames=[
-                    "src/memorius/i18n/ru/cards.ftl",
-                    "src/memorius/i18n/ru/common.ftl",
-                    "src/memorius/i18n/ru/decks.ftl",
-                    "src/memorius/i18n/ru/help.ftl",
-                    "src/memorius/i18n/ru/review.ftl",
-                    "src/memorius/i18n/ru/start.ftl",
-                    "src/memorius/i18n/ru/statistics.ftl",
-                ],
-            ),
-        ),
-        FluentTranslator(
-            locale="en",
-            translator=FluentBundle.from_files(
-                locale="en-US",
-                filenames=[
-                    "src/memorius/i18n/en/cards.ftl",
-                    "src/memorius/i18n/en/common.ftl",
-                    "src/memorius/i18n/en/decks.ftl",
-                    "src/memorius/i18n/en/help.ftl",
-                    "src/memorius/i18n/en/review.ftl",
-                    "src/memorius/i18n/en/start.ftl",
-                    "src/memorius/i18n/en/statistics.ftl",
-                ],
-            ),
-        ),
-    ],
+    bundle_locales={"ru": "ru-RU", "en": "en-US"},
     root_locale="en",
+    cache_dir=Path(settings.I18N_CACHE_DIR) if settings.I18N_CACHE_DIR else None,
 )
 
 
 async def main() -> None:
     session = AiohttpSession()
+    session.middleware(
+        ThrottlingRequestMiddleware(
+            global_rate=settings.TELEGRAM_GLOBAL_RATE,
+            chat_rate=settings.TELEGRAM_CHAT_RATE,
+            group_rate=settings.TELEGRAM_GROUP_RATE,
+            chat_burst=settings.TELEGRAM_CHAT_BURST,
+            retries=settings.TELEGRAM_RETRY_ATTEMPTS,
+        )
+    )
     bot = Bot(token=settings.BOT_TOKEN, session=session, default=DefaultBotProperties(parse_mode="HTML"))
 
-    dp = Dispatcher(t_hub=translator_hub)
+    if settings.FSM_STORAGE == "database":
+        storage = PostgresStorage(
+            async_session_maker,
+            ttl=settings.FSM_STATE_TTL,
+            cache_size=settings.FSM_CACHE_SIZE,
+            cache_ttl=settings.FSM_CACHE_TTL,
+        )
+    else:
+        storage = MemoryStorage()
+
+    dp = Dispatcher(storage=storage, events_isolation=event_isolation, t_hub=translator_hub)
 
     dp.update.middleware(DatabaseMiddleware(async_session_maker))
     dp.update.middleware(TranslateMiddleware())
+    dp.update.middleware(BufferedStateMiddleware())
+    dp.message.outer_middleware(MenuMiddleware(build_menu_index(translator_hub.bundle_locales)))
+    dp.callback_query.outer_middleware(CallbackDataMiddleware(build_callback_index()))
 
     dp.include_router(main_router)
 
+    if settings.REVIEW_LOG_BUFFER:
+        review_log_buffer.start(async_session_maker)
+
+    pool_monitor = None
+    if settings.DB_POOL_CHECK_INTERVAL > 0:
+        pool_monitor = asyncio.create_task(monitor_pool(engine, settings.DB_POOL_CHECK_INTERVAL))
+
+    state_janitor = None
+    if isinstance(storage, PostgresStorage) and settings.FSM_PURGE_INTERVAL > 0:
+        state_janitor = asyncio.create_task(purge_states(storage, settings.FSM_PURGE_INTERVAL))
+
+    deadline_poller = None
+    if settings.TIMEOUT_BACKEND == "database":
+        deadline_poller = asyncio.create_task(
+            poll_deadlines(
+                async_session_maker,
+                partial(expire_deadline, bot, dp.storage, translator_hub),
+                settings.TIMEOUT_POLL_INTERVAL,
+                settings.TIMEOUT_POLL_BATCH,
+                settings.TIMEOUT_CLAIM_LEASE,
+            )
+        )
+
     try:
         logger.info("Starting bot...")
-        await dp.start_polling(bot)
+        if settings.BOT_MODE == "webhook":
+            await run_webhook(dp, bot)
+        else:
+            await bot.delete_webhook()
+            await dp.start_polling(
+                bot,
+                allowed_updates=dp.resolve_used_update_types(),
+                handle_as_tasks=True,
+                tasks_concurrency_limit=settings.UPDATES_CONCURRENCY_LIMIT,
+            )
     except Exception as e:
         logger.error(f"Error occurred: {e}")
     finally:
+        if pool_monitor:
+            pool_monitor.cancel()
+        if deadline_poller:
+            deadline_poller.cancel()
+        if state_janitor:
+            state_janitor.cancel()
+        await timeout_wheel.stop()
+        await review_log_buffer.stop()
         await bot.session.close()
 
 
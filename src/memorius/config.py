@@ -1,19 +1,94 @@
+from pathlib import Path
+from typing import Literal
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     BOT_TOKEN: str
 
+    # Update delivery: "polling" (getUpdates) or "webhook" (aiohttp server Telegram pushes to).
+    # WEBHOOK_BASE_URL is the public https address, WEBHOOK_SECRET (A-Z, a-z, 0-9, _ and -) is checked per request;
+    # both are required in webhook mode
+    BOT_MODE: Literal["polling", "webhook"] = "polling"
+    WEBHOOK_BASE_URL: str = ""
+    WEBHOOK_PATH: str = "/webhook"
+    WEBHOOK_HOST: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8080
+    WEBHOOK_SECRET: str = ""
+    WEBHOOK_MAX_CONNECTIONS: int = 40
+
+    # Updates processed concurrently by one process (polling and webhook); one user's updates always run in order
+    UPDATES_CONCURRENCY_LIMIT: int = 100
+
+    # Outgoing messages per second: overall, to one private chat and to one group; chats may burst a little.
+    # A 429 is retried up to TELEGRAM_RETRY_ATTEMPTS times after the retry_after Telegram asks for
+    TELEGRAM_GLOBAL_RATE: float = 30.0
+    TELEGRAM_CHAT_RATE: float = 1.0
+    TELEGRAM_GROUP_RATE: float = 20 / 60
+    TELEGRAM_CHAT_BURST: float = 3
+    TELEGRAM_RETRY_ATTEMPTS: int = 3
+
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str
 
+    # Connection pool; liveness is checked in the background every DB_POOL_CHECK_INTERVAL seconds (0 disables)
+    # instead of pinging on every checkout, set DB_POOL_PRE_PING=true to get the per-checkout ping back
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_CHECK_INTERVAL: float = 30.0
+
+    # FSM storage: "memory" (per process, lost on restart) or "database" (fsm_states, shared by all workers).
+    # States idle for FSM_STATE_TTL seconds are dropped; FSM_CACHE_TTL bounds how stale the per-process cache
+    # may get, keep it short (or 0) when several workers serve one bot
+    FSM_STORAGE: Literal["memory", "database"] = "memory"
+    FSM_STATE_TTL: int = 7 * 24 * 3600
+    FSM_CACHE_SIZE: int = 10_000
+    FSM_CACHE_TTL: float = 5.0
+    FSM_PURGE_INTERVAL: float = 3600.0
+
     TIMEOUT_SECONDS: int = 60
+    # Due cards read ahead per review session, the next batch is loaded once half of it is used
+    REVIEW_PREFETCH_SIZE: int = 20
+    # Answer timeouts: "memory" keeps deadlines in a per-process timer wheel, "database" stores them in
+    # review_deadlines where any worker polls for expired ones, so they survive restarts; a claimed deadline
+    # comes back after TIMEOUT_CLAIM_LEASE seconds if its worker dies before handling it
+    TIMEOUT_BACKEND: Literal["memory", "database"] = "memory"
+    TIMEOUT_POLL_INTERVAL: float = 1.0
+    TIMEOUT_POLL_BATCH: int = 100
+    TIMEOUT_CLAIM_LEASE: float = 60.0
+
+    # Compiled translations are cached here keyed by the .ftl contents, empty disables the cache
+    I18N_CACHE_DIR: str = str(Path.home() / ".cache" / "memorius" / "i18n")
+
+    # In-process user profile cache used by TranslateMiddleware
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL: float = 300.0
+
+    # Write-behind review log: queue statistics rows and COPY them in batches.
+    # A failing batch is tried REVIEW_LOG_MAX_ATTEMPTS times and at most REVIEW_LOG_MAX_ROWS rows are kept queued
+    REVIEW_LOG_BUFFER: bool = False
+    REVIEW_LOG_BATCH_SIZE: int = 500
+    REVIEW_LOG_FLUSH_INTERVAL: float = 2.0
+    REVIEW_LOG_MAX_ROWS: int = 100_000
+    REVIEW_LOG_MAX_ATTEMPTS: int = 5
 
     model_config = SettingsConfigDict(env_file=".env")
 
+    @model_validator(mode="after")
+    def check_webhook(self) -> "Settings":
+        # Without a secret anyone who finds the webhook URL can push forged updates
+        if self.BOT_MODE == "webhook" and not (self.WEBHOOK_BASE_URL and self.WEBHOOK_SECRET):
+            raise ValueError("BOT_MODE=webhook requires WEBHOOK_BASE_URL and WEBHOOK_SECRET")
+        return self
+
     @property
     def DATABASE_URL(self) -> str:
         return (
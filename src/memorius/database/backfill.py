@@ -0,0 +1,21 @@
+import asyncio
+import logging
+
+from memorius.database.database import async_session_maker, engine
+from memorius.database.repositories import StatisticsRepository
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    """Rebuild statistics_daily from existing review history"""
+    async with async_session_maker() as session:
+        logger.info("Backfilling daily statistics...")
+        await StatisticsRepository(session).backfill_daily()
+        logger.info("Daily statistics backfilled")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from memorius.database.repositories import DeadlineRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def poll_deadlines(
+    session_maker: async_sessionmaker,
+    on_expired: Callable[[Row], Awaitable],
+    interval: float,
+    batch_size: int,
+    lease: float,
+) -> None:
+    """Claim expired review deadlines and hand each one to on_expired
+
+    Any number of workers can poll the same table: claiming leases FOR UPDATE SKIP LOCKED rows to one
+    worker, and a deadline is removed only after on_expired succeeded. A worker that dies mid-way leaves
+    its deadlines to be claimed again after the lease, so on_expired must ignore deadlines already handled.
+    """
+    while True:
+        rows = []
+        try:
+            async with session_maker() as session:
+                rows = await DeadlineRepository(session).claim_expired(batch_size, lease)
+        except Exception:
+            logger.exception("Failed to claim expired review deadlines")
+
+        handled = []
+        for row in rows:
+            try:
+                await on_expired(row)
+            except Exception:
+                logger.exception("Failed to expire review deadline for user %s", row.user_id)
+            else:
+                handled.append(row)
+
+        try:
+            async with session_maker() as session:
+                await DeadlineRepository(session).release(handled)
+        except Exception:
+            logger.exception("Failed to release handled review deadlines")
+
+        if len(rows) < batch_size:
+            await asyncio.sleep(interval)
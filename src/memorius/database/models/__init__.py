@@ -1,13 +1,19 @@
 from memorius.database.models.base import Base
 from memorius.database.models.card import Card
 from memorius.database.models.deck import Deck
+from memorius.database.models.fsm_state import FsmState
+from memorius.database.models.review_deadline import ReviewDeadline
 from memorius.database.models.statistics import Statistics
+from memorius.database.models.statistics_daily import StatisticsDaily
 from memorius.database.models.user import User
 
 __all__ = [
     "Base",
     "Card",
     "Deck",
+    "FsmState",
+    "ReviewDeadline",
     "Statistics",
+    "StatisticsDaily",
     "User",
 ]
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, Text, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from memorius.database.models.base import Base
@@ -8,6 +8,17 @@ from memorius.database.models.base import Base
 
 class Card(Base):
     __tablename__ = "cards"
+    __table_args__ = (
+        Index("ix_cards_deck_id_next_review_id", "deck_id", "next_review", "id"),
+        Index(
+            "ix_cards_new_deck_id_next_review_id",
+            "deck_id",
+            "next_review",
+            "id",
+            postgresql_where=text("first_reviewed_at IS NULL"),
+        ),
+        Index("ix_cards_deck_id_first_reviewed_at", "deck_id", "first_reviewed_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     deck_id: Mapped[int] = mapped_column(Integer, ForeignKey("decks.id", ondelete="CASCADE"), nullable=False)
@@ -25,6 +36,7 @@ class Card(Base):
     interval: Mapped[int] = mapped_column(Integer, default=0)  # days
     repetitions: Mapped[int] = mapped_column(Integer, default=0)
     next_review: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    first_reviewed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)  # NULL while the card is new
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
     deck: Mapped["Deck"] = relationship("Deck", back_populates="cards")  # noqa: F821
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from memorius.database.models.base import Base
@@ -8,10 +8,13 @@ from memorius.database.models.base import Base
 
 class Deck(Base):
     __tablename__ = "decks"
+    __table_args__ = (Index("ix_decks_user_id_created_at", "user_id", "created_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
+    max_reviews_per_day: Mapped[int] = mapped_column(Integer, default=200, server_default="200", nullable=False)
+    new_cards_per_day: Mapped[int] = mapped_column(Integer, default=20, server_default="20", nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
     user: Mapped["User"] = relationship("User", back_populates="decks")  # noqa: F821
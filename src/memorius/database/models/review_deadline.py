@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from memorius.database.models.base import Base
+
+
+class ReviewDeadline(Base):
+    __tablename__ = "review_deadlines"
+    __table_args__ = (Index("ix_review_deadlines_deadline", "deadline"),)
+
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    message_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    card_id: Mapped[int | None] = mapped_column(Integer, nullable=True)  # NULL for deadlines set before it was stored
+    deadline: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -1,13 +1,16 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from memorius.database.models.base import Base
 
+DIFFICULTIES = ("easy", "medium", "hard", "skipped")
+
 
 class Statistics(Base):
     __tablename__ = "statistics"
+    __table_args__ = (Index("ix_statistics_user_id_session_date", "user_id", "session_date"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
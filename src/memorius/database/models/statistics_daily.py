@@ -0,0 +1,18 @@
+from datetime import date
+
+from sqlalchemy import BigInteger, Date, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from memorius.database.models.base import Base
+
+
+class StatisticsDaily(Base):
+    __tablename__ = "statistics_daily"
+
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    deck_id: Mapped[int] = mapped_column(Integer, ForeignKey("decks.id", ondelete="CASCADE"), primary_key=True)
+    easy: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    medium: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    hard: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    skipped: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
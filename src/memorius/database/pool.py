@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from time import monotonic
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+logger = logging.getLogger(__name__)
+
+# Warn once checked out connections reach this share of pool_size + max_overflow
+SATURATION_WARNING = 0.8
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def connect(self) -> PoolProxiedConnection:
+        started = monotonic()
+        try:
+            return super().connect()
+        finally:
+            waited = monotonic() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def stats(self, reset: bool = False) -> dict:
+        """Pool gauges; wait figures cover checkouts since the last reset"""
+        stats = {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+        }
+        if reset:
+            self.checkouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+        return stats
+
+
+async def check_pool(engine: AsyncEngine) -> bool:
+    """Liveness probe; a failed probe on a dropped connection invalidates the pool"""
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        logger.warning(f"Database liveness check failed: {e}")
+        return False
+
+
+async def monitor_pool(engine: AsyncEngine, interval: float) -> None:
+    """Periodically probe the database and publish pool gauges to the log"""
+    while True:
+        await asyncio.sleep(interval)
+        await check_pool(engine)
+
+        pool = engine.pool
+        if not isinstance(pool, InstrumentedPool):
+            continue
+
+        stats = pool.stats(reset=True)
+        capacity = stats["size"] + max(stats["max_overflow"], 0)
+        if capacity and stats["checked_out"] >= capacity * SATURATION_WARNING:
+            logger.warning(f"Database pool near exhaustion: {stats}")
+        else:
+            logger.info(f"Database pool: {stats}")
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from memorius.config import settings
+from memorius.database.database import async_session_maker
+from memorius.database.models import Card
+from memorius.database.repositories import CardRepository
+from memorius.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewQueue:
+    """Cards read ahead for one review session"""
+
+    def __init__(self, deck_id: int, until: datetime, after: tuple[datetime, int], new: bool | None = None):
+        self.deck_id = deck_id
+        self.until = until
+        self.new = new
+        self.after = after  # keyset position of the last card loaded
+        self.cards: deque[Card] = deque()
+        self.current: Card | None = None
+        self.exhausted = False
+        self.fill: asyncio.Task | None = None
+
+
+class CardPrefetcher:
+    """Per-session read-ahead of due cards, refilled in the background while the user answers
+
+    The buffer is only an optimisation: every lookup is checked against the cursor kept in FSM data,
+    so a missing or stale queue (another worker, restart, eviction) falls back to loading from the database.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker, batch_size: int = 20, max_sessions: int = 10_000):
+        self.session_maker = session_maker
+        self.batch_size = batch_size
+        self._queues = TTLCache(maxsize=max_sessions, ttl=3600)
+
+    def start(self, user_id: int, deck_id: int, until: datetime, card: Card, new: bool | None = None) -> None:
+        """Begin reading ahead after the first card of a session"""
+        queue = ReviewQueue(deck_id, until, (card.next_review, card.id), new)
+        queue.current = card
+        self._queues.set(user_id, queue)
+        self._refill(queue)
+
+    def current(self, user_id: int, card_id: int) -> Card | None:
+        """The card last handed out for user's session, if it is card_id"""
+        queue = self._queues.get(user_id)
+        if queue and queue.current is not None and queue.current.id == card_id:
+            return queue.current
+        return None
+
+    async def next(
+        self, user_id: int, deck_id: int, until: datetime, after: tuple[datetime, int], new: bool | None = None
+    ) -> Card | None:
+        """Next due card after the cursor, taken from the buffer when it is warm
+
+        new narrows the cards to new ones (True) or to already reviewed ones (False), see CardRepository.get_due_cards.
+        """
+        queue = self._queues.get(user_id)
+        if queue is None or (queue.deck_id, queue.until, queue.new) != (deck_id, until, new) or queue.after < after:
+            queue = ReviewQueue(deck_id, until, after, new)
+            self._queues.set(user_id, queue)
+
+        self._discard_before(queue, after)
+        if not queue.cards and not queue.exhausted:
+            self._refill(queue)
+            try:
+                await asyncio.shield(queue.fill)
+            except Exception:
+                # Already logged by _filled; the user still gets their card, straight from the database
+                return await self._load(queue, after)
+            self._discard_before(queue, after)
+
+        card = queue.cards.popleft() if queue.cards else None
+        queue.current = card
+        if len(queue.cards) <= self.batch_size // 2:
+            self._refill(queue)
+        return card
+
+    def drop(self, user_id: int) -> None:
+        """Forget user's session"""
+        self._queues.pop(user_id)
+
+    async def _load(self, queue: ReviewQueue, after: tuple[datetime, int]) -> Card | None:
+        async with self.session_maker() as session:
+            card_repo = CardRepository(session)
+            cards = await card_repo.get_due_cards(queue.deck_id, queue.until, after=after, limit=1, new=queue.new)
+        queue.current = cards[0] if cards else None
+        return queue.current
+
+    def _discard_before(self, queue: ReviewQueue, after: tuple[datetime, int]) -> None:
+        while queue.cards and (queue.cards[0].next_review, queue.cards[0].id) <= after:
+            queue.cards.popleft()
+
+    def _refill(self, queue: ReviewQueue) -> None:
+        if queue.fill is None and not queue.exhausted:
+            queue.fill = asyncio.create_task(self._fill(queue))
+            queue.fill.add_done_callback(self._filled)
+
+    async def _fill(self, queue: ReviewQueue) -> None:
+        try:
+            async with self.session_maker() as session:
+                card_repo = CardRepository(session)
+                cards = await card_repo.get_due_cards(
+                    queue.deck_id, queue.until, after=queue.after, limit=self.batch_size, new=queue.new
+                )
+        finally:
+            queue.fill = None
+
+        queue.cards.extend(cards)
+        if cards:
+            queue.after = (cards[-1].next_review, cards[-1].id)
+        queue.exhausted = len(cards) < self.batch_size
+
+    def _filled(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception():
+            logger.error("Failed to prefetch review cards", exc_info=task.exception())
+
+
+card_prefetcher = CardPrefetcher(async_session_maker, settings.REVIEW_PREFETCH_SIZE)
@@ -1,11 +1,15 @@
 from memorius.database.repositories.card import CardRepository
+from memorius.database.repositories.deadline import DeadlineRepository
 from memorius.database.repositories.deck import DeckRepository
+from memorius.database.repositories.review import ReviewRepository
 from memorius.database.repositories.statistics import StatisticsRepository
 from memorius.database.repositories.user import UserRepository
 
 __all__ = [
     "CardRepository",
+    "DeadlineRepository",
     "DeckRepository",
+    "ReviewRepository",
     "StatisticsRepository",
     "UserRepository",
 ]
@@ -1,10 +1,60 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 
-from sqlalchemy import and_, select
+from sqlalchemy import ColumnElement, Integer, Update, case, cast, func, literal, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from memorius.database.models import Card
 
+# SM-2 answer quality per difficulty, anything else (skipped) is 0
+QUALITY = {"easy": 5, "medium": 3, "hard": 2}
+
+
+def review_update(card_id: int, difficulty: str) -> Update:
+    """Set-based SM-2 update of a single card"""
+    quality = QUALITY.get(difficulty, 0)
+    now = literal(datetime.now())
+
+    first_reviewed_at = func.coalesce(Card.first_reviewed_at, now)
+
+    if quality < 3:
+        return (
+            update(Card)
+            .where(Card.id == card_id)
+            .values(repetitions=0, interval=0, next_review=now, first_reviewed_at=first_reviewed_at)
+        )
+
+    interval = case(
+        (Card.repetitions == 0, 1),
+        (Card.repetitions == 1, 6),
+        else_=cast(func.floor(Card.interval * Card.ease_factor), Integer),
+    )
+    ease_delta = 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    return (
+        update(Card)
+        .where(Card.id == card_id)
+        .values(
+            interval=interval,
+            repetitions=Card.repetitions + 1,
+            ease_factor=func.greatest(1.3, Card.ease_factor + ease_delta),
+            next_review=now + func.make_interval(0, 0, 0, interval),
+            first_reviewed_at=first_reviewed_at,
+        )
+    )
+
+
+def due_kind(reviews_left: int, new_left: int) -> bool | None:
+    """Cards the daily limits still allow: None for any, True for new cards only, False for reviews only"""
+    if new_left <= 0:
+        return False
+    if reviews_left <= 0:
+        return True
+    return None
+
+
+def due_kind_clause(new: bool) -> ColumnElement[bool]:
+    """Restrict cards to new ones or to already reviewed ones"""
+    return Card.first_reviewed_at.is_(None) if new else Card.first_reviewed_at.is_not(None)
+
 
 class CardRepository:
     def __init__(self, session: AsyncSession):
@@ -46,12 +96,47 @@ class CardRepository:
         )
         return list(result.scalars().all())
 
-    async def get_cards_for_review(self, deck_id: int) -> list[Card]:
-        """Get cards that need review"""
-        now = datetime.now()
-        result = await self.session.execute(
-            select(Card).where(and_(Card.deck_id == deck_id, Card.next_review <= now)).order_by(Card.next_review)
+    async def get_first_due_card(
+        self, deck_id: int, until: datetime, reviews_left: int, new_left: int
+    ) -> tuple[Card, int] | None:
+        """Get the first card due for review at until and the session size the daily limits allow"""
+        if reviews_left <= 0 and new_left <= 0:
+            return None
+
+        due = (Card.deck_id == deck_id, Card.next_review <= until)
+        reviews = select(Card.id).where(*due, due_kind_clause(False)).limit(max(reviews_left, 0))
+        fresh = select(Card.id).where(*due, due_kind_clause(True)).limit(max(new_left, 0))
+        total = (
+            select(func.count()).select_from(reviews.subquery()).scalar_subquery()
+            + select(func.count()).select_from(fresh.subquery()).scalar_subquery()
         )
+
+        stmt = select(Card, total).where(*due)
+        new = due_kind(reviews_left, new_left)
+        if new is not None:
+            stmt = stmt.where(due_kind_clause(new))
+        result = await self.session.execute(stmt.order_by(Card.next_review, Card.id).limit(1))
+        row = result.one_or_none()
+        return (row[0], row[1]) if row else None
+
+    async def get_due_cards(
+        self,
+        deck_id: int,
+        until: datetime,
+        after: tuple[datetime, int] | None = None,
+        limit: int = 1,
+        new: bool | None = None,
+    ) -> list[Card]:
+        """Get cards due for review at until, keyset-paginated on (next_review, id)
+
+        new narrows the result to new cards (True) or to already reviewed ones (False).
+        """
+        stmt = select(Card).where(Card.deck_id == deck_id, Card.next_review <= until)
+        if after is not None:
+            stmt = stmt.where(tuple_(Card.next_review, Card.id) > after)
+        if new is not None:
+            stmt = stmt.where(due_kind_clause(new))
+        result = await self.session.execute(stmt.order_by(Card.next_review, Card.id).limit(limit))
         return list(result.scalars().all())
 
     async def get_card_by_id(self, card_id: int) -> Card | None:
@@ -85,41 +170,6 @@ class CardRepository:
             card.correct_variant = correct_variant
             await self.session.commit()
 
-    async def update_card_review(self, card_id: int, difficulty: str) -> None:
-        """Update card review statistics using SM-2 algorithm"""
-        result = await self.session.execute(select(Card).where(Card.id == card_id))
-        card = result.scalar_one_or_none()
-
-        if not card:
-            return
-
-        # SM-2 algorithm implementation
-        if difficulty == "easy":
-            quality = 5
-        elif difficulty == "medium":
-            quality = 3
-        elif difficulty == "hard":
-            quality = 2
-        else:  # skipped
-            quality = 0
-
-        if quality >= 3:
-            if card.repetitions == 0:
-                card.interval = 1
-            elif card.repetitions == 1:
-                card.interval = 6
-            else:
-                card.interval = int(card.interval * card.ease_factor)
-
-            card.repetitions += 1
-            card.ease_factor = max(1.3, card.ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)))
-        else:
-            card.repetitions = 0
-            card.interval = 0
-
-        card.next_review = datetime.now() + timedelta(days=card.interval)
-        await self.session.commit()
-
     async def delete_card(self, card_id: int) -> None:
         """Delete card"""
         result = await self.session.execute(select(Card).where(Card.id == card_id))
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from sqlalchemy import Row, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from memorius.database.models import ReviewDeadline
+
+
+class DeadlineRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def schedule(self, user_id: int, chat_id: int, message_id: int, card_id: int, delay: float) -> None:
+        """Set user's answer deadline for card_id, replacing the previous one"""
+        deadline = func.localtimestamp() + timedelta(seconds=delay)
+        stmt = insert(ReviewDeadline).values(
+            user_id=user_id, chat_id=chat_id, message_id=message_id, card_id=card_id, deadline=deadline
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ReviewDeadline.user_id],
+            set_={
+                "chat_id": stmt.excluded.chat_id,
+                "message_id": stmt.excluded.message_id,
+                "card_id": stmt.excluded.card_id,
+                "deadline": deadline,
+            },
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def cancel(self, user_id: int) -> None:
+        """Drop user's answer deadline"""
+        await self.session.execute(delete(ReviewDeadline).where(ReviewDeadline.user_id == user_id))
+        await self.session.commit()
+
+    async def claim_expired(self, limit: int, lease: float) -> list[Row]:
+        """Lease up to limit expired deadlines, skipping rows another worker is claiming
+
+        A leased deadline is pushed lease seconds ahead rather than removed, so if the worker dies before
+        release() it expires again and another worker picks it up.
+        """
+        expired = (
+            select(ReviewDeadline.user_id)
+            .where(ReviewDeadline.deadline <= func.localtimestamp())
+            .order_by(ReviewDeadline.deadline)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(ReviewDeadline)
+            .where(ReviewDeadline.user_id.in_(expired.scalar_subquery()))
+            .values(deadline=func.localtimestamp() + timedelta(seconds=lease))
+            .returning(
+                ReviewDeadline.user_id,
+                ReviewDeadline.chat_id,
+                ReviewDeadline.message_id,
+                ReviewDeadline.card_id,
+                ReviewDeadline.deadline,
+            )
+        )
+        result = await self.session.execute(stmt)
+        rows = list(result.all())
+        await self.session.commit()
+        return rows
+
+    async def release(self, leased: list[Row]) -> None:
+        """Drop handled deadlines, except those rescheduled in the meantime"""
+        if not leased:
+            return
+        stmt = delete(ReviewDeadline).where(
+            tuple_(ReviewDeadline.user_id, ReviewDeadline.deadline).in_([(row.user_id, row.deadline) for row in leased])
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
@@ -1,8 +1,10 @@
-from sqlalchemy import select
+from datetime import datetime
+
+from sqlalchemy import Row, delete, exists, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from memorius.database.models import Deck
+from memorius.database.models import Card, Deck
 
 
 class DeckRepository:
@@ -20,22 +22,51 @@ class DeckRepository:
     async def get_user_decks(self, user_id: int) -> list[Deck]:
         """Get all user decks"""
         result = await self.session.execute(
-            select(Deck)
+            select(Deck).where(Deck.user_id == user_id).order_by(Deck.created_at.desc())
+        )
+        return list(result.scalars().all())
+
+    async def get_deck_summaries(self, user_id: int) -> list[Row]:
+        """Get user decks with card and due counts (id, name, cards_count, due_count)"""
+        now = datetime.now()
+        result = await self.session.execute(
+            select(
+                Deck.id,
+                Deck.name,
+                func.count(Card.id).label("cards_count"),
+                func.count(Card.id).filter(Card.next_review <= now).label("due_count"),
+            )
+            .outerjoin(Card, Card.deck_id == Deck.id)
             .where(Deck.user_id == user_id)
-            .options(selectinload(Deck.cards))
+            .group_by(Deck.id)
             .order_by(Deck.created_at.desc())
         )
-        return list(result.scalars().all())
+        return list(result.all())
 
     async def get_deck_by_id(self, deck_id: int) -> Deck | None:
         """Get deck by ID"""
         result = await self.session.execute(select(Deck).where(Deck.id == deck_id).options(selectinload(Deck.cards)))
         return result.scalar_one_or_none()
 
+    async def get_deck_header(self, deck_id: int) -> Row | None:
+        """Get deck name and card count without loading cards (id, name, cards_count, has_cards)"""
+        cards_count = select(func.count(Card.id)).where(Card.deck_id == Deck.id).scalar_subquery()
+        result = await self.session.execute(
+            select(
+                Deck.id,
+                Deck.name,
+                cards_count.label("cards_count"),
+                exists().where(Card.deck_id == Deck.id).label("has_cards"),
+            ).where(Deck.id == deck_id)
+        )
+        return result.one_or_none()
+
+    async def deck_has_cards(self, deck_id: int) -> bool:
+        """Check whether deck contains at least one card"""
+        result = await self.session.execute(select(exists().where(Card.deck_id == deck_id)))
+        return result.scalar_one()
+
     async def delete_deck(self, deck_id: int) -> None:
-        """Delete deck"""
-        result = await self.session.execute(select(Deck).where(Deck.id == deck_id))
-        deck = result.scalar_one_or_none()
-        if deck:
-            await self.session.delete(deck)
-            await self.session.commit()
+        """Delete deck, cards and statistics are removed by ON DELETE CASCADE"""
+        await self.session.execute(delete(Deck).where(Deck.id == deck_id))
+        await self.session.commit()
@@ -0,0 +1,95 @@
+from datetime import date, datetime, time
+
+from sqlalchemy import BigInteger, Date, DateTime, Integer, Row, String, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from memorius.database.models import Card, Deck, Statistics, StatisticsDaily
+from memorius.database.repositories.card import review_update
+from memorius.database.repositories.statistics import daily_upsert
+from memorius.database.review_log import review_log_buffer
+
+
+class ReviewRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_review_budget(self, user_id: int, deck_id: int) -> tuple[int, int]:
+        """Reviews and new cards the deck's daily limits still allow today
+
+        Today's answers come from the statistics_daily rollup; cards first reviewed today count as new, not as reviews.
+        """
+        today = date.today()
+        midnight = datetime.combine(today, time.min)
+        answered = (
+            select(
+                func.coalesce(
+                    func.sum(
+                        StatisticsDaily.easy + StatisticsDaily.medium + StatisticsDaily.hard + StatisticsDaily.skipped
+                    ),
+                    0,
+                )
+            )
+            .where(StatisticsDaily.user_id == user_id, StatisticsDaily.day == today, StatisticsDaily.deck_id == deck_id)
+            .scalar_subquery()
+        )
+        introduced = (
+            select(func.count()).where(Card.deck_id == deck_id, Card.first_reviewed_at >= midnight).scalar_subquery()
+        )
+
+        result = await self.session.execute(
+            select(
+                Deck.max_reviews_per_day - (answered - introduced),
+                Deck.new_cards_per_day - introduced,
+            ).where(Deck.id == deck_id)
+        )
+        row = result.one_or_none()
+        return (row[0], row[1]) if row else (0, 0)
+
+    async def grade_card(
+        self, card_id: int, user_id: int, difficulty: str, due_by: datetime | None = None
+    ) -> Row | None:
+        """Apply SM-2 grade and write the review log in one statement and one commit
+
+        Returns the graded card (id, deck_id, interval, next_review) or None if it no longer exists.
+        With due_by, the card is graded only while it is still due at due_by: grading moves next_review past it,
+        so a second grade of the same card in one review session, from any worker, is a no-op returning None.
+        With the write-behind review log running, only the card is updated here and the log row is queued.
+        """
+        graded = review_update(card_id, difficulty)
+        if due_by is not None:
+            graded = graded.where(Card.next_review <= due_by)
+        graded = graded.returning(Card.id, Card.deck_id, Card.interval, Card.next_review)
+
+        if review_log_buffer.is_running:
+            result = await self.session.execute(graded)
+            card = result.one_or_none()
+            await self.session.commit()
+            if card:
+                review_log_buffer.add(user_id=user_id, deck_id=card.deck_id, card_id=card.id, difficulty=difficulty)
+            return card
+
+        now = datetime.now()
+        graded = graded.cte("graded")
+        logged = (
+            insert(Statistics)
+            .from_select(
+                ["user_id", "deck_id", "card_id", "difficulty", "session_date"],
+                select(
+                    literal(user_id, BigInteger),
+                    graded.c.deck_id,
+                    graded.c.id,
+                    literal(difficulty, String),
+                    literal(now, DateTime),
+                ),
+            )
+            .cte("logged")
+        )
+        rolled_up = daily_upsert(
+            difficulty,
+            select(literal(user_id, BigInteger), literal(now.date(), Date), graded.c.deck_id, literal(1, Integer)),
+        ).cte("rolled_up")
+
+        result = await self.session.execute(select(graded).add_cte(logged, rolled_up))
+        card = result.one_or_none()
+        await self.session.commit()
+        return card
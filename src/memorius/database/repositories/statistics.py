@@ -1,9 +1,22 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
-from sqlalchemy import and_, select
+from sqlalchemy import BigInteger, Insert, Integer, Select, and_, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import Date
 
-from memorius.database.models import Statistics
+from memorius.database.models import Statistics, StatisticsDaily
+from memorius.database.models.statistics import DIFFICULTIES
+from memorius.database.review_log import review_log_buffer
+
+
+def daily_upsert(difficulty: str, rows: Select) -> Insert:
+    """Add (user_id, day, deck_id, count) rows to one difficulty counter of the daily rollup"""
+    stmt = insert(StatisticsDaily).from_select(["user_id", "day", "deck_id", difficulty], rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[StatisticsDaily.user_id, StatisticsDaily.day, StatisticsDaily.deck_id],
+        set_={difficulty: getattr(StatisticsDaily, difficulty) + stmt.excluded[difficulty]},
+    )
 
 
 class StatisticsRepository:
@@ -11,36 +24,59 @@ class StatisticsRepository:
         self.session = session
 
     async def add_statistics(self, user_id: int, deck_id: int, card_id: int, difficulty: str) -> None:
-        """Add statistics entry"""
+        """Add statistics entry and bump the daily rollup in the same transaction"""
+        if review_log_buffer.is_running:
+            review_log_buffer.add(user_id=user_id, deck_id=deck_id, card_id=card_id, difficulty=difficulty)
+            return
+
+        # The day comes from the app clock, like in the buffered path and the readers, not from the database
+        now = datetime.now()
         stat = Statistics(
             user_id=user_id,
             deck_id=deck_id,
             card_id=card_id,
             difficulty=difficulty,
+            session_date=now,
         )
         self.session.add(stat)
+
+        row = select(
+            literal(user_id, BigInteger), literal(now.date(), Date), literal(deck_id, Integer), literal(1, Integer)
+        )
+        await self.session.execute(daily_upsert(difficulty, row))
         await self.session.commit()
 
     async def get_user_statistics(self, user_id: int, days: int = 30) -> dict:
         """Get user statistics for specified period"""
-        start_date = datetime.now() - timedelta(days=days)
+        start_day = date.today() - timedelta(days=days - 1)
 
         result = await self.session.execute(
-            select(Statistics).where(and_(Statistics.user_id == user_id, Statistics.session_date >= start_date))
+            select(*(func.coalesce(func.sum(getattr(StatisticsDaily, d)), 0) for d in DIFFICULTIES)).where(
+                and_(StatisticsDaily.user_id == user_id, StatisticsDaily.day >= start_day)
+            )
         )
-        stats = result.scalars().all()
-
-        total = len(stats)
-        easy = sum(1 for s in stats if s.difficulty == "easy")
-        medium = sum(1 for s in stats if s.difficulty == "medium")
-        hard = sum(1 for s in stats if s.difficulty == "hard")
-        skipped = sum(1 for s in stats if s.difficulty == "skipped")
+        counts = dict(zip(DIFFICULTIES, result.one(), strict=True))
 
         return {
-            "total": total,
-            "easy": easy,
-            "medium": medium,
-            "hard": hard,
-            "skipped": skipped,
+            "total": sum(counts.values()),
+            **counts,
             "period_days": days,
         }
+
+    async def backfill_daily(self) -> None:
+        """Rebuild the daily rollup from the raw statistics log"""
+        day = cast(Statistics.session_date, Date)
+        aggregated = select(
+            Statistics.user_id,
+            day,
+            Statistics.deck_id,
+            *(func.count().filter(Statistics.difficulty == d) for d in DIFFICULTIES),
+        ).group_by(Statistics.user_id, day, Statistics.deck_id)
+
+        stmt = insert(StatisticsDaily).from_select(["user_id", "day", "deck_id", *DIFFICULTIES], aggregated)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StatisticsDaily.user_id, StatisticsDaily.day, StatisticsDaily.deck_id],
+            set_={d: stmt.excluded[d] for d in DIFFICULTIES},
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
@@ -1,7 +1,9 @@
-from sqlalchemy import select, update
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from memorius.database.models import User
+from memorius.utils.cache import UserProfile, user_profile_cache
 
 
 class UserRepository:
@@ -15,30 +17,45 @@ class UserRepository:
         first_name: str | None = None,
         last_name: str | None = None,
     ) -> User:
-        """Get existing user or create new one"""
-        result = await self.session.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        """Get existing user or create new one with a single INSERT ... ON CONFLICT"""
+        stmt = insert(User).values(id=user_id, username=username, first_name=first_name, last_name=last_name)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.id],
+            set_={
+                "username": stmt.excluded.username,
+                "first_name": stmt.excluded.first_name,
+                "last_name": stmt.excluded.last_name,
+            },
+            # Skip the row rewrite (and its dead tuple) when the profile did not change
+            where=or_(
+                User.username.is_distinct_from(stmt.excluded.username),
+                User.first_name.is_distinct_from(stmt.excluded.first_name),
+                User.last_name.is_distinct_from(stmt.excluded.last_name),
+            ),
+        ).returning(User)
 
-        if not user:
-            user = User(
-                id=user_id,
-                username=username,
-                first_name=first_name,
-                last_name=last_name,
-            )
-            self.session.add(user)
-            await self.session.commit()
-            await self.session.refresh(user)
+        result = await self.session.execute(
+            select(User).from_statement(stmt), execution_options={"populate_existing": True}
+        )
+        user = result.scalar_one_or_none()
+        if user is None:
+            # Nothing changed, so RETURNING came back empty
+            result = await self.session.execute(select(User).where(User.id == user_id))
+            user = result.scalar_one()
+        await self.session.commit()
 
+        user_profile_cache.set(user_id, UserProfile(user.language_code, user.phone_number))
         return user
 
     async def update_phone(self, user_id: int, phone_number: str) -> None:
         """Update user phone number"""
-        result = await self.session.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if user:
-            user.phone_number = phone_number
-            await self.session.commit()
+        stmt = update(User).where(User.id == user_id).values(phone_number=phone_number)
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+        profile = user_profile_cache.get(user_id)
+        if profile:
+            user_profile_cache.set(user_id, profile._replace(phone_number=phone_number))
 
     async def update_language(self, user_id: int, language_code: str) -> None:
         """Update user's language preference"""
@@ -46,8 +63,16 @@ class UserRepository:
         await self.session.execute(stmt)
         await self.session.commit()
 
+        profile = user_profile_cache.get(user_id)
+        if profile:
+            user_profile_cache.set(user_id, profile._replace(language_code=language_code))
+
     async def get_user_language(self, user_id: int) -> str:
         """Get user's language preference"""
+        profile = user_profile_cache.get(user_id)
+        if profile:
+            return profile.language_code
+
         stmt = select(User.language_code).where(User.id == user_id)
         result = await self.session.execute(stmt)
         language_code = result.scalar_one_or_none()
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from collections import Counter
+from contextlib import suppress
+from datetime import datetime
+
+from sqlalchemy import Integer, any_, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from memorius.config import settings
+from memorius.database.models import Card, Statistics, StatisticsDaily
+from memorius.database.models.statistics import DIFFICULTIES
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["user_id", "deck_id", "card_id", "difficulty", "session_date"]
+
+
+class ReviewLogBuffer:
+    """Write-behind sink for review-log rows, flushed in batches with COPY
+
+    A batch that fails to flush is retried up to max_attempts times, and at most max_rows rows are held
+    while the database is unreachable; beyond that the oldest rows are dropped.
+    """
+
+    def __init__(
+        self, batch_size: int = 500, flush_interval: float = 2.0, max_rows: int = 100_000, max_attempts: int = 5
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.max_attempts = max_attempts
+        self._rows: list[tuple] = []
+        self._failures = 0
+        self._session_maker: async_sessionmaker | None = None
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None
+
+    def start(self, session_maker: async_sessionmaker) -> None:
+        """Start background flushing"""
+        self._session_maker = session_maker
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop background flushing and write whatever is still queued"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self.flush()
+
+    def add(self, user_id: int, deck_id: int, card_id: int, difficulty: str) -> None:
+        """Queue one review-log row"""
+        self._rows.append((user_id, deck_id, card_id, difficulty, datetime.now()))
+        self._trim()
+        if len(self._rows) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Write queued rows to statistics and statistics_daily in one transaction"""
+        async with self._lock:
+            rows, self._rows = self._rows, []
+            if not rows:
+                return
+            try:
+                async with self._session_maker() as session:
+                    await write_rows(session, rows)
+            except Exception:
+                self._failures += 1
+                if self._failures >= self.max_attempts:
+                    logger.exception("Dropping %d review-log rows after %d failed flushes", len(rows), self._failures)
+                    self._failures = 0
+                else:
+                    logger.exception("Failed to flush %d review-log rows, requeueing", len(rows))
+                    self._rows[:0] = rows
+                    self._trim()
+            else:
+                self._failures = 0
+
+    def _trim(self) -> None:
+        excess = len(self._rows) - self.max_rows
+        if excess > 0:
+            del self._rows[:excess]
+            logger.warning("Review-log queue is full, dropped the %d oldest rows", excess)
+
+    async def _run(self) -> None:
+        while True:
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            self._wakeup.clear()
+            await self.flush()
+            if self._failures:
+                # Back off instead of retrying as fast as new rows arrive
+                await asyncio.sleep(self.flush_interval * self._failures)
+
+
+async def write_rows(session: AsyncSession, rows: list[tuple]) -> None:
+    """COPY raw rows into statistics and add their per-day counts to the rollup
+
+    Rows of cards deleted since they were queued are dropped; the remaining cards are locked against
+    deletion until the commit so the COPY cannot hit a foreign key violation.
+    """
+    # One array parameter, however many rows were queued
+    card_ids = literal(list({row[2] for row in rows}), ARRAY(Integer))
+    result = await session.execute(
+        select(Card.id, Card.deck_id).where(Card.id == any_(card_ids)).with_for_update(key_share=True)
+    )
+    existing = set(result.tuples())
+    kept = [row for row in rows if (row[2], row[1]) in existing]
+    if len(kept) < len(rows):
+        logger.info("Dropping %d review-log rows of deleted cards", len(rows) - len(kept))
+    if not kept:
+        await session.commit()
+        return
+    rows = kept
+
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        Statistics.__tablename__, records=rows, columns=COLUMNS
+    )
+
+    counts: dict[tuple, Counter] = {}
+    for user_id, deck_id, _, difficulty, session_date in rows:
+        counts.setdefault((user_id, session_date.date(), deck_id), Counter())[difficulty] += 1
+
+    stmt = insert(StatisticsDaily).values(
+        [
+            {"user_id": user_id, "day": day, "deck_id": deck_id, **{d: counter[d] for d in DIFFICULTIES}}
+            for (user_id, day, deck_id), counter in counts.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StatisticsDaily.user_id, StatisticsDaily.day, StatisticsDaily.deck_id],
+        set_={d: getattr(StatisticsDaily, d) + stmt.excluded[d] for d in DIFFICULTIES},
+    )
+    await session.execute(stmt)
+    await session.commit()
+
+
+review_log_buffer = ReviewLogBuffer(
+    settings.REVIEW_LOG_BATCH_SIZE,
+    settings.REVIEW_LOG_FLUSH_INTERVAL,
+    settings.REVIEW_LOG_MAX_ROWS,
+    settings.REVIEW_LOG_MAX_ATTEMPTS,
+)
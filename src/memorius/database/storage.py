@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from collections.abc import Mapping
+from datetime import timedelta
+from typing import Any
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from sqlalchemy import case, delete, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from memorius.database.models import FsmState
+from memorius.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# What each column of an abandoned row reads as
+EMPTY_RECORD = {"state": None, "data": {}}
+
+
+class PostgresStorage(BaseStorage):
+    """FSM storage backed by the fsm_states table with a per-process write-through cache
+
+    Rows not written for ttl seconds are treated as abandoned: reads ignore them and purge() deletes them.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        ttl: int,
+        cache_size: int = 10_000,
+        cache_ttl: float = 5.0,
+        key_builder: KeyBuilder | None = None,
+    ):
+        self.session_maker = session_maker
+        self.ttl = timedelta(seconds=ttl)
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        state = state.state if isinstance(state, State) else state
+        await self._store(self.key_builder.build(key), state=state)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        state, _ = await self._load(self.key_builder.build(key))
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            msg = f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            raise DataNotDictLikeError(msg)
+        await self._store(self.key_builder.build(key), data=data.copy())
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        _, data = await self._load(self.key_builder.build(key))
+        return data.copy()
+
+    async def close(self) -> None:
+        """Nothing to close, connections belong to the shared engine"""
+        self._cache.clear()
+
+    async def purge(self) -> int:
+        """Delete abandoned and empty states, returns how many rows were removed"""
+        stmt = delete(FsmState).where(
+            or_(
+                FsmState.updated_at < func.localtimestamp() - self.ttl,
+                (FsmState.state.is_(None)) & (FsmState.data == {}),
+            )
+        )
+        async with self.session_maker() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    async def _load(self, key: str) -> tuple[str | None, dict[str, Any]]:
+        record = self._cache.get(key)
+        if record is not None:
+            return record
+
+        stmt = select(FsmState.state, FsmState.data).where(
+            FsmState.key == key, FsmState.updated_at >= func.localtimestamp() - self.ttl
+        )
+        async with self.session_maker() as session:
+            row = (await session.execute(stmt)).one_or_none()
+
+        record = (row.state, row.data) if row else (None, {})
+        self._cache.set(key, record)
+        return record
+
+    async def _store(self, key: str, **values: Any) -> None:
+        """Upsert one column of the row and cache the full record the database returns"""
+        stmt = insert(FsmState).values(key=key, updated_at=func.localtimestamp(), **values)
+        set_ = {"updated_at": stmt.excluded.updated_at, **{name: stmt.excluded[name] for name in values}}
+        # An abandoned row must not revive its other column along with the one being written
+        expired = FsmState.updated_at < stmt.excluded.updated_at - self.ttl
+        for name, empty in EMPTY_RECORD.items():
+            if name not in values:
+                column = FsmState.__table__.c[name]
+                set_[name] = case((expired, literal(empty, column.type)), else_=column)
+        stmt = stmt.on_conflict_do_update(index_elements=[FsmState.key], set_=set_).returning(
+            FsmState.state, FsmState.data
+        )
+
+        async with self.session_maker() as session:
+            row = (await session.execute(stmt)).one()
+            await session.commit()
+
+        self._cache.set(key, (row.state, row.data))
+
+
+async def purge_states(storage: PostgresStorage, interval: float) -> None:
+    """Periodically drop abandoned FSM states"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            purged = await storage.purge()
+        except Exception:
+            logger.exception("Failed to purge FSM states")
+        else:
+            logger.info(f"Purged {purged} FSM states")
@@ -1,11 +1,13 @@
 from aiogram import Router
 
-from memorius.handlers.user import card, deck, help, language, session, start, statistics
+from memorius.handlers.user import callbacks, card, deck, help, language, session, start, statistics
 
 router = Router()
 router.include_routers(
     start.router, deck.router, card.router, session.router, statistics.router, help.router, language.router
 )
+# Every callback query goes through the table the modules above filled in on import
+router.include_router(callbacks.router)
 
 __all__ = [
     "router",
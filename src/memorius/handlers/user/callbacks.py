@@ -0,0 +1,25 @@
+from typing import Any
+
+from aiogram import Router
+from aiogram.types import CallbackQuery
+from fluentogram import TranslatorRunner
+
+from memorius.utils import callback_table
+
+router = Router()
+
+
+async def expired_button(callback: CallbackQuery, locale: TranslatorRunner):
+    """Answer taps no handler takes: buttons of an older layout or of a session that has ended"""
+    await callback.answer(locale.button_expired())
+
+
+@router.callback_query()
+async def dispatch_callback(callback: CallbackQuery, **data: Any):
+    """Route a callback query to the handler registered in the table for its data type and action"""
+    handler = callback_table.resolve(data.get("callback_data"))
+    if handler is not None:
+        matched, kwargs = await handler.check(callback, **data)
+        if matched:
+            return await handler.call(callback, **kwargs)
+    await expired_button(callback, data["locale"])
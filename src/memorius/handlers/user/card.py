@@ -1,4 +1,4 @@
-from aiogram import F, Router
+from aiogram import Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 from fluentogram import TranslatorRunner
@@ -11,15 +11,26 @@ from memorius.keyboards import (
     get_card_type_keyboard,
     get_deck_actions_keyboard,
 )
-from memorius.utils import CreateCard, EditCard
+from memorius.utils import (
+    CardAction,
+    CardCallback,
+    CardTypeCallback,
+    CreateCard,
+    DeckAction,
+    DeckCallback,
+    EditCard,
+    callback_table,
+)
 
 router = Router()
 
 
-@router.callback_query(F.data.startswith("add_card_"))
-async def add_card_start(callback: CallbackQuery, state: FSMContext, locale: TranslatorRunner):
+@callback_table.handler(DeckCallback, action=DeckAction.ADD_CARD)
+async def add_card_start(
+    callback: CallbackQuery, callback_data: DeckCallback, state: FSMContext, locale: TranslatorRunner
+):
     """Start adding card - select card type"""
-    deck_id = int(callback.data.split("_")[2])
+    deck_id = callback_data.deck_id
 
     await state.update_data(deck_id=deck_id)
     await state.set_state(CreateCard.waiting_for_card_type)
@@ -28,10 +39,12 @@ async def add_card_start(callback: CallbackQuery, state: FSMContext, locale: Tra
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("card_type_"))
-async def add_card_type_selected(callback: CallbackQuery, state: FSMContext, locale: TranslatorRunner):
+@callback_table.handler(CardTypeCallback)
+async def add_card_type_selected(
+    callback: CallbackQuery, callback_data: CardTypeCallback, state: FSMContext, locale: TranslatorRunner
+):
     """Process card type selection"""
-    card_type = callback.data.split("_")[2]  # 'text' or 'variants'
+    card_type = callback_data.card_type
 
     await state.update_data(card_type=card_type)
     await state.set_state(CreateCard.waiting_for_question)
@@ -70,8 +83,7 @@ async def add_card_finish(message: Message, state: FSMContext, session: AsyncSes
     await state.clear()
 
     deck_repo = DeckRepository(session)
-    deck = await deck_repo.get_deck_by_id(deck_id)
-    has_cards = len(deck.cards) > 0
+    has_cards = await deck_repo.deck_has_cards(deck_id)
 
     await message.answer(locale.card_added(), reply_markup=get_deck_actions_keyboard(deck_id, has_cards, locale))
 
@@ -138,8 +150,7 @@ async def add_card_correct_variant(
         await state.clear()
 
         deck_repo = DeckRepository(session)
-        deck = await deck_repo.get_deck_by_id(deck_id)
-        has_cards = len(deck.cards) > 0
+        has_cards = await deck_repo.deck_has_cards(deck_id)
 
         await message.answer(locale.card_added(), reply_markup=get_deck_actions_keyboard(deck_id, has_cards, locale))
 
@@ -147,10 +158,16 @@ async def add_card_correct_variant(
         await message.answer(locale.enter_number_only(), reply_markup=get_cancel_keyboard(locale))
 
 
-@router.callback_query(F.data.startswith("edit_card_id_"))
-async def edit_card_start(callback: CallbackQuery, state: FSMContext, session: AsyncSession, locale: TranslatorRunner):
+@callback_table.handler(CardCallback, action=CardAction.EDIT)
+async def edit_card_start(
+    callback: CallbackQuery,
+    callback_data: CardCallback,
+    state: FSMContext,
+    session: AsyncSession,
+    locale: TranslatorRunner,
+):
     """Start editing card"""
-    card_id = int(callback.data.split("_")[-1])
+    card_id = callback_data.card_id
 
     card_repo = CardRepository(session)
     card = await card_repo.get_card_by_id(card_id)
@@ -168,11 +185,12 @@ async def edit_card_start(callback: CallbackQuery, state: FSMContext, session: A
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("edit_card_"))
-async def edit_card_select(callback: CallbackQuery, session: AsyncSession, locale: TranslatorRunner):
+@callback_table.handler(DeckCallback, action=DeckAction.EDIT_CARDS)
+async def edit_card_select(
+    callback: CallbackQuery, callback_data: DeckCallback, session: AsyncSession, locale: TranslatorRunner
+):
     """Select card to edit"""
-    parts = callback.data.split("_")
-    deck_id = int(parts[2])
+    deck_id = callback_data.deck_id
 
     card_repo = CardRepository(session)
     cards = await card_repo.get_deck_cards(deck_id)
@@ -182,7 +200,7 @@ async def edit_card_select(callback: CallbackQuery, session: AsyncSession, local
         return
 
     await callback.message.edit_text(
-        locale.select_card_edit(), reply_markup=get_card_list_keyboard(cards, "edit", deck_id, locale)
+        locale.select_card_edit(), reply_markup=get_card_list_keyboard(cards, CardAction.EDIT, deck_id, locale)
     )
     await callback.answer()
 
@@ -218,8 +236,7 @@ async def edit_card_finish(message: Message, state: FSMContext, session: AsyncSe
     await state.clear()
 
     deck_repo = DeckRepository(session)
-    deck = await deck_repo.get_deck_by_id(deck_id)
-    has_cards = len(deck.cards) > 0
+    has_cards = await deck_repo.deck_has_cards(deck_id)
 
     await message.answer(locale.card_updated(), reply_markup=get_deck_actions_keyboard(deck_id, has_cards, locale))
 
@@ -287,8 +304,7 @@ async def edit_card_correct_variant(
         await state.clear()
 
         deck_repo = DeckRepository(session)
-        deck = await deck_repo.get_deck_by_id(deck_id)
-        has_cards = len(deck.cards) > 0
+        has_cards = await deck_repo.deck_has_cards(deck_id)
 
         await message.answer(locale.card_updated(), reply_markup=get_deck_actions_keyboard(deck_id, has_cards, locale))
 
@@ -296,10 +312,12 @@ async def edit_card_correct_variant(
         await message.answer(locale.enter_number_only(), reply_markup=get_cancel_keyboard(locale))
 
 
-@router.callback_query(F.data.startswith("delete_card_id_"))
-async def delete_card_confirm(callback: CallbackQuery, session: AsyncSession, locale: TranslatorRunner):
+@callback_table.handler(CardCallback, action=CardAction.DELETE)
+async def delete_card_confirm(
+    callback: CallbackQuery, callback_data: CardCallback, session: AsyncSession, locale: TranslatorRunner
+):
     """Confirm card deletion"""
-    card_id = int(callback.data.split("_")[-1])
+    card_id = callback_data.card_id
 
     card_repo = CardRepository(session)
     card = await card_repo.get_card_by_id(card_id)
@@ -312,8 +330,7 @@ async def delete_card_confirm(callback: CallbackQuery, session: AsyncSession, lo
     await card_repo.delete_card(card_id)
 
     deck_repo = DeckRepository(session)
-    deck = await deck_repo.get_deck_by_id(deck_id)
-    has_cards = len(deck.cards) > 0
+    has_cards = await deck_repo.deck_has_cards(deck_id)
 
     await callback.message.edit_text(
         locale.card_deleted(), reply_markup=get_deck_actions_keyboard(deck_id, has_cards, locale)
@@ -321,11 +338,12 @@ async def delete_card_confirm(callback: CallbackQuery, session: AsyncSession, lo
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("delete_card_"))
-async def delete_card_select(callback: CallbackQuery, session: AsyncSession, locale: TranslatorRunner):
+@callback_table.handler(DeckCallback, action=DeckAction.DELETE_CARDS)
+async def delete_card_select(
+    callback: CallbackQuery, callback_data: DeckCallback, session: AsyncSession, locale: TranslatorRunner
+):
     """Select card to delete"""
-    parts = callback.data.split("_")
-    deck_id = int(parts[2])
+    deck_id = callback_data.deck_id
 
     card_repo = CardRepository(session)
     cards = await card_repo.get_deck_cards(deck_id)
@@ -335,6 +353,6 @@ async def delete_card_select(callback: CallbackQuery, session: AsyncSession, loc
         return
 
     await callback.message.edit_text(
-        locale.select_card_delete(), reply_markup=get_card_list_keyboard(cards, "delete", deck_id, locale)
+        locale.select_card_delete(), reply_markup=get_card_list_keyboard(cards, CardAction.DELETE, deck_id, locale)
     )
     await callback.answer()
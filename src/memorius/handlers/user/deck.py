@@ -1,4 +1,4 @@
-from aiogram import F, Router
+from aiogram import Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 from fluentogram import TranslatorRunner
@@ -12,19 +12,21 @@ from memorius.keyboards import (
     get_deck_actions_keyboard,
     get_deck_list_keyboard,
 )
-from memorius.utils import CreateDeck, validate_deck_name
+from memorius.utils import (
+    CreateDeck,
+    DeckAction,
+    DeckCallback,
+    MenuAction,
+    MenuCallback,
+    MenuFilter,
+    callback_table,
+    validate_deck_name,
+)
 
 router = Router()
 
 
-@router.message(
-    F.text.in_(
-        [
-            "➕ Создать колоду",  # Russian
-            "➕ Create deck",  # English
-        ]
-    )
-)
+@router.message(MenuFilter("create_deck"))
 async def create_deck_start(message: Message, state: FSMContext, locale: TranslatorRunner):
     """Start deck creation"""
     await state.set_state(CreateDeck.waiting_for_name)
@@ -49,19 +51,12 @@ async def create_deck_finish(message: Message, state: FSMContext, session: Async
     )
 
 
-@router.message(
-    F.text.in_(
-        [
-            "📚 Мои колоды",  # Russian
-            "📚 My decks",  # English
-        ]
-    )
-)
-@router.callback_query(F.data == "my_decks")
+@router.message(MenuFilter("my_decks"))
+@callback_table.handler(MenuCallback, action=MenuAction.DECKS)
 async def show_my_decks(event: Message | CallbackQuery, session: AsyncSession, locale: TranslatorRunner):
     """Show user's decks"""
     deck_repo = DeckRepository(session)
-    decks = await deck_repo.get_user_decks(event.from_user.id)
+    decks = await deck_repo.get_deck_summaries(event.from_user.id)
 
     if not decks:
         text = locale.no_decks()
@@ -77,32 +72,33 @@ async def show_my_decks(event: Message | CallbackQuery, session: AsyncSession, l
         await event.answer()
 
 
-@router.callback_query(F.data.startswith("deck_"))
-async def show_deck_actions(callback: CallbackQuery, session: AsyncSession, locale: TranslatorRunner):
+@callback_table.handler(DeckCallback, action=DeckAction.SHOW)
+async def show_deck_actions(
+    callback: CallbackQuery, callback_data: DeckCallback, session: AsyncSession, locale: TranslatorRunner
+):
     """Show deck actions"""
-    deck_id = int(callback.data.split("_")[1])
+    deck_id = callback_data.deck_id
 
     deck_repo = DeckRepository(session)
-    deck = await deck_repo.get_deck_by_id(deck_id)
+    deck = await deck_repo.get_deck_header(deck_id)
 
     if not deck:
         await callback.answer(locale.deck_not_found(), show_alert=True)
         return
 
-    has_cards = len(deck.cards) > 0
-    cards_count = len(deck.cards)
-
     await callback.message.edit_text(
-        locale.deck_info(name=deck.name, count=cards_count),
-        reply_markup=get_deck_actions_keyboard(deck_id, has_cards, locale),
+        locale.deck_info(name=deck.name, count=deck.cards_count),
+        reply_markup=get_deck_actions_keyboard(deck_id, deck.has_cards, locale),
     )
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("open_deck_"))
-async def open_deck(callback: CallbackQuery, session: AsyncSession, locale: TranslatorRunner):
+@callback_table.handler(DeckCallback, action=DeckAction.OPEN)
+async def open_deck(
+    callback: CallbackQuery, callback_data: DeckCallback, session: AsyncSession, locale: TranslatorRunner
+):
     """Show all cards in deck"""
-    deck_id = int(callback.data.split("_")[2])
+    deck_id = callback_data.deck_id
 
     card_repo = CardRepository(session)
     cards = await card_repo.get_deck_cards(deck_id)
@@ -120,13 +116,15 @@ async def open_deck(callback: CallbackQuery, session: AsyncSession, locale: Tran
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("delete_deck_"))
-async def delete_deck_confirm(callback: CallbackQuery, session: AsyncSession, locale: TranslatorRunner):
+@callback_table.handler(DeckCallback, action=DeckAction.DELETE)
+async def delete_deck_confirm(
+    callback: CallbackQuery, callback_data: DeckCallback, session: AsyncSession, locale: TranslatorRunner
+):
     """Confirm deck deletion"""
-    deck_id = int(callback.data.split("_")[2])
+    deck_id = callback_data.deck_id
 
     deck_repo = DeckRepository(session)
-    deck = await deck_repo.get_deck_by_id(deck_id)
+    deck = await deck_repo.get_deck_header(deck_id)
 
     if not deck:
         await callback.answer(locale.deck_not_found(), show_alert=True)
@@ -140,7 +138,7 @@ async def delete_deck_confirm(callback: CallbackQuery, session: AsyncSession, lo
     await callback.answer()
 
 
-@router.callback_query(F.data == "cancel")
+@callback_table.handler(MenuCallback, action=MenuAction.CANCEL)
 async def cancel_action(callback: CallbackQuery, state: FSMContext, locale: TranslatorRunner):
     """Cancel current action"""
     await state.clear()
@@ -1,15 +1,16 @@
-from aiogram import F, Router
+from aiogram import Router
 from aiogram.types import CallbackQuery, Message
 from fluentogram import TranslatorHub, TranslatorRunner
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from memorius.database.repositories import UserRepository
 from memorius.keyboards import get_language_keyboard, get_main_menu_keyboard
+from memorius.utils import LanguageCallback, MenuFilter, callback_table
 
 router = Router()
 
 
-@router.message(F.text.in_(["🌐 Язык", "🌐 Language"]))
+@router.message(MenuFilter("language"))
 async def show_language_menu(
     message: Message,
     locale: TranslatorRunner,
@@ -20,13 +21,14 @@ async def show_language_menu(
     )
 
 
-@router.callback_query(F.data.startswith("lang_"))
+@callback_table.handler(LanguageCallback)
 async def change_language(
     callback: CallbackQuery,
+    callback_data: LanguageCallback,
     session: AsyncSession,
     t_hub: TranslatorHub,
 ):
-    language_code = callback.data.split("_", 1)[1]
+    language_code = callback_data.language_code
 
     user_repo = UserRepository(session)
     await user_repo.update_language(
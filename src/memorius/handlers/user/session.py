@@ -1,233 +1,351 @@
-import asyncio
-from contextlib import suppress
+import logging
+from datetime import datetime
+from functools import partial
 
-from aiogram import Bot, F, Router
+from aiogram import Bot, Router
+from aiogram.exceptions import TelegramAPIError
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery
-from fluentogram import TranslatorRunner
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup
+from fluentogram import TranslatorHub, TranslatorRunner
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from memorius.config import settings
-from memorius.database.repositories import CardRepository, DeckRepository, StatisticsRepository
+from memorius.database.database import async_session_maker
+from memorius.database.models import Card
+from memorius.database.prefetch import card_prefetcher
+from memorius.database.repositories import (
+    CardRepository,
+    DeadlineRepository,
+    DeckRepository,
+    ReviewRepository,
+    StatisticsRepository,
+    UserRepository,
+)
+from memorius.database.repositories.card import due_kind
 from memorius.keyboards import (
     get_deck_actions_keyboard,
     get_difficulty_keyboard,
     get_review_keyboard,
     get_variant_keyboard,
 )
-from memorius.utils import ReviewSession
+from memorius.middlewares.fsm import BufferedFSMContext
+from memorius.utils import (
+    DeckAction,
+    DeckCallback,
+    GradeCallback,
+    ReviewAction,
+    ReviewCallback,
+    ReviewSession,
+    TimerWheel,
+    VariantCallback,
+    callback_table,
+    event_isolation,
+    message_editor,
+)
+
+logger = logging.getLogger(__name__)
 
 router = Router()
 
-timeout_tasks = {}
+timeout_wheel = TimerWheel(tick=1.0)
+
+# Budget of sessions started before the daily limits were kept in FSM data
+UNLIMITED_BUDGET = 1_000_000
 
 
 async def handle_timeout(
     user_id: int,
     chat_id: int,
     message_id: int,
+    card_id: int,
     state: FSMContext,
-    session: AsyncSession,
     locale: TranslatorRunner,
     bot: Bot,
 ):
     """Handle question timeout"""
+    state = BufferedFSMContext(state.storage, state.key)
     try:
-        await asyncio.sleep(settings.TIMEOUT_SECONDS)
+        async with event_isolation.lock(state.key), async_session_maker() as session:
+            await _expire_card(user_id, chat_id, message_id, card_id, state, session, locale, bot)
+            await state.flush()
+    except Exception:
+        logger.exception("Error in timeout handler")
+
+
+async def expire_deadline(bot: Bot, storage: BaseStorage, t_hub: TranslatorHub, deadline: Row):
+    """Handle a durable deadline claimed from review_deadlines"""
+    state = BufferedFSMContext(storage, StorageKey(bot_id=bot.id, chat_id=deadline.chat_id, user_id=deadline.user_id))
+    async with event_isolation.lock(state.key), async_session_maker() as session:
+        language = await UserRepository(session).get_user_language(deadline.user_id)
+        locale = t_hub.get_translator_by_locale(language)
+        await _expire_card(
+            deadline.user_id, deadline.chat_id, deadline.message_id, deadline.card_id, state, session, locale, bot
+        )
+        await state.flush()
 
-        data = await state.get_data()
 
-        current_state = await state.get_state()
-        if current_state != ReviewSession.in_session:
-            return
+def review_cursor(card: Card) -> list:
+    """Keyset position of a card in the review order, kept in FSM data instead of the whole queue"""
+    return [card.next_review.isoformat(), card.id]
 
-        if not data or "current_index" not in data:
-            return
 
-        current_index = data["current_index"]
-        cards = data["cards"]
-        deck_id = data["deck_id"]
+def review_after(data: dict) -> tuple[datetime, int]:
+    """Keyset position of the current card, as stored by review_cursor"""
+    next_review, card_id = data["cursor"]
+    return datetime.fromisoformat(next_review), card_id
+
+
+def spend_budget(data: dict, card: Card) -> dict:
+    """Daily limit left after showing card: new cards use the new-card limit, the rest the review limit"""
+    if card.first_reviewed_at is None:
+        return {"new_left": data.get("new_left", UNLIMITED_BUDGET) - 1}
+    return {"reviews_left": data.get("reviews_left", UNLIMITED_BUDGET) - 1}
 
-        card_repo = CardRepository(session)
-        await card_repo.update_card_review(card_id=cards[current_index], difficulty="hard")
 
-        stats_repo = StatisticsRepository(session)
-        await stats_repo.add_statistics(
-            user_id=user_id, deck_id=deck_id, card_id=cards[current_index], difficulty="hard"
+async def next_due_card(user_id: int, data: dict) -> Card | None:
+    """Next card of the session, or None once the deck or today's limits are exhausted"""
+    reviews_left = data.get("reviews_left", UNLIMITED_BUDGET)
+    new_left = data.get("new_left", UNLIMITED_BUDGET)
+    if reviews_left <= 0 and new_left <= 0:
+        return None
+
+    until = datetime.fromisoformat(data["until"])
+    return await card_prefetcher.next(
+        user_id, data["deck_id"], until, review_after(data), new=due_kind(reviews_left, new_left)
+    )
+
+
+async def grade_current_card(session: AsyncSession, user_id: int, data: dict, difficulty: str) -> bool:
+    """Grade the session's current card, False if a repeated tap, the timeout or another worker graded it first"""
+    until = datetime.fromisoformat(data["until"]) if "until" in data else None
+    graded = await ReviewRepository(session).grade_card(
+        card_id=data["card_id"], user_id=user_id, difficulty=difficulty, due_by=until
+    )
+    if graded is not None:
+        return True
+    # A card deleted mid-session cannot be graded either, the session moves past it as before
+    return await CardRepository(session).get_card_by_id(data["card_id"]) is None
+
+
+def question_view(card: Card, position: int, total: int, locale: TranslatorRunner) -> tuple[str, InlineKeyboardMarkup]:
+    """Question message text and keyboard for a card"""
+    text = locale.question_number(current=position, total=total) + "\n\n" + card.question
+
+    if card.card_type == "variants":
+        variants_text = ""
+        for i in range(1, 5):
+            variant = getattr(card, f"variant_{i}", None)
+            if variant:
+                variants_text += f"{i}. {variant}\n"
+
+        return text + "\n\n" + variants_text, get_variant_keyboard(card, locale)
+
+    return text, get_review_keyboard(card.id, locale)
+
+
+async def _expire_card(
+    user_id: int,
+    chat_id: int,
+    message_id: int,
+    card_id: int | None,
+    state: FSMContext,
+    session: AsyncSession,
+    locale: TranslatorRunner,
+    bot: Bot,
+):
+    """Grade the unanswered card as hard and move on to the next one"""
+    data = await state.get_data()
+
+    current_state = await state.get_state()
+    if current_state != ReviewSession.in_session:
+        return
+
+    if not data or "card_id" not in data:
+        return
+
+    # The card was answered, or its deadline already handled, since this deadline was set
+    if card_id is not None and data["card_id"] != card_id:
+        return
+
+    if not await grade_current_card(session, user_id, data, "hard"):
+        return
+
+    data = await state.update_data(hard=data.get("hard", 0) + 1)
+
+    try:
+        await bot.send_message(chat_id=chat_id, text=locale.timeout_msg())
+    except TelegramAPIError as e:
+        logger.warning(f"Could not send timeout notice to chat {chat_id}: {e}")
+
+    deck_id = data["deck_id"]
+
+    card = await next_due_card(user_id, data)
+
+    if card is None:
+        card_prefetcher.drop(user_id)
+        await state.clear()
+
+        deck_repo = DeckRepository(session)
+        has_cards = await deck_repo.deck_has_cards(deck_id)
+
+        try:
+            await message_editor.edit(
+                bot,
+                chat_id,
+                message_id,
+                locale.session_complete(
+                    total=data["position"],
+                    easy=data.get("easy", 0),
+                    medium=data.get("medium", 0),
+                    hard=data.get("hard", 0),
+                    skipped=data.get("skipped", 0),
+                ),
+                reply_markup=get_deck_actions_keyboard(deck_id, has_cards, locale),
+            )
+        except TelegramAPIError as e:
+            logger.warning(f"Could not show session results in chat {chat_id}: {e}")
+    else:
+        position = data["position"] + 1
+        await state.update_data(
+            card_id=card.id, cursor=review_cursor(card), position=position, **spend_budget(data, card)
         )
 
-        hard_count = data.get("hard", 0) + 1
-        await state.update_data(hard=hard_count)
+        text, keyboard = question_view(card, position, data["total"], locale)
 
         try:
-            timeout_msg = locale.timeout_msg()
-            await bot.send_message(chat_id=chat_id, text=timeout_msg)
-        except suppress(Exception):
-            pass
-
-        data = await state.get_data()  # Refresh data
-        current_index = data["current_index"] + 1
-        cards = data["cards"]
-        deck_id = data["deck_id"]
-
-        if current_index >= len(cards):
-            total = len(cards)
-            easy = data.get("easy", 0)
-            medium = data.get("medium", 0)
-            hard = data.get("hard", 0)
-            skipped = data.get("skipped", 0)
-
-            await state.clear()
-
-            deck_repo = DeckRepository(session)
-            deck = await deck_repo.get_deck_by_id(deck_id)
-            has_cards = len(deck.cards) > 0
-
-            try:
-                await bot.edit_message_text(
-                    chat_id=chat_id,
-                    message_id=message_id,
-                    text=locale.session_complete(total=total, easy=easy, medium=medium, hard=hard, skipped=skipped),
-                    reply_markup=get_deck_actions_keyboard(deck_id, has_cards, locale),
-                )
-            except suppress(Exception):
-                pass
+            await message_editor.edit(bot, chat_id, message_id, text, reply_markup=keyboard)
+        except TelegramAPIError as e:
+            # The review message is gone or unreachable, leave the session without a running timer
+            logger.warning(f"Could not show next card in chat {chat_id}: {e}")
         else:
-            await state.update_data(current_index=current_index)
-
-            card_repo = CardRepository(session)
-            card = await card_repo.get_card_by_id(cards[current_index])
-
-            if card:
-                if card.card_type == "variants":
-                    variants_text = ""
-                    for i in range(1, 5):
-                        variant = getattr(card, f"variant_{i}", None)
-                        if variant:
-                            variants_text += f"{i}. {variant}\n"
-
-                    text = (
-                        locale.question_number(current=current_index + 1, total=len(cards))
-                        + "\n\n"
-                        + card.question
-                        + "\n\n"
-                        + variants_text
-                    )
-                    keyboard = get_variant_keyboard(card, locale)
-                else:
-                    text = locale.question_number(current=current_index + 1, total=len(cards)) + "\n\n" + card.question
-                    keyboard = get_review_keyboard(locale)
-
-                try:
-                    await bot.edit_message_text(
-                        chat_id=chat_id, message_id=message_id, text=text, reply_markup=keyboard
-                    )
-
-                    await start_timeout(user_id, chat_id, message_id, state, session, locale, bot)
-                except suppress(Exception):
-                    pass
-
-        if user_id in timeout_tasks:
-            del timeout_tasks[user_id]
-
-    except asyncio.CancelledError:
-        pass
-    except Exception as e:
-        print(f"Error in timeout handler: {e}")
+            await start_timeout(user_id, chat_id, message_id, card.id, state, locale, bot, session)
 
 
 async def start_timeout(
     user_id: int,
     chat_id: int,
     message_id: int,
+    card_id: int,
     state: FSMContext,
-    session: AsyncSession,
     locale: TranslatorRunner,
     bot: Bot,
+    session: AsyncSession,
 ):
-    """Start timeout countdown"""
-    if user_id in timeout_tasks:
-        timeout_tasks[user_id].cancel()
+    """Start timeout countdown for card_id"""
+    if settings.TIMEOUT_BACKEND == "database":
+        await DeadlineRepository(session).schedule(user_id, chat_id, message_id, card_id, settings.TIMEOUT_SECONDS)
+        return
 
-    task = asyncio.create_task(handle_timeout(user_id, chat_id, message_id, state, session, locale, bot))
-    timeout_tasks[user_id] = task
+    timeout_wheel.schedule(
+        user_id,
+        settings.TIMEOUT_SECONDS,
+        # The update's own context is buffered and flushed when the handler returns, the timer gets a plain one
+        partial(
+            handle_timeout, user_id, chat_id, message_id, card_id, FSMContext(state.storage, state.key), locale, bot
+        ),
+    )
 
 
-def cancel_timeout(user_id: int):
+async def cancel_timeout(user_id: int, session: AsyncSession):
     """Cancel timeout for user"""
-    if user_id in timeout_tasks:
-        timeout_tasks[user_id].cancel()
-        del timeout_tasks[user_id]
+    if settings.TIMEOUT_BACKEND == "database":
+        await DeadlineRepository(session).cancel(user_id)
+        return
 
+    timeout_wheel.cancel(user_id)
 
-@router.callback_query(F.data.startswith("start_session_"))
-async def start_session(callback: CallbackQuery, state: FSMContext, session: AsyncSession, locale: TranslatorRunner):
+
+@callback_table.handler(DeckCallback, action=DeckAction.START_SESSION)
+async def start_session(
+    callback: CallbackQuery,
+    callback_data: DeckCallback,
+    state: FSMContext,
+    session: AsyncSession,
+    locale: TranslatorRunner,
+):
     """Start review session"""
-    deck_id = int(callback.data.split("_")[2])
+    deck_id = callback_data.deck_id
+    until = datetime.now()
+
+    review_repo = ReviewRepository(session)
+    reviews_left, new_left = await review_repo.get_review_budget(callback.from_user.id, deck_id)
 
     card_repo = CardRepository(session)
-    cards = await card_repo.get_cards_for_review(deck_id)
+    first = await card_repo.get_first_due_card(deck_id, until, reviews_left, new_left)
 
-    if not cards:
-        await callback.answer(locale.all_cards_reviewed(), show_alert=True)
+    if first is None:
+        # The limits only explain an empty session when they hold back cards that are due
+        limited = (reviews_left <= 0 or new_left <= 0) and bool(await card_repo.get_due_cards(deck_id, until))
+        await callback.answer(locale.daily_limit_reached() if limited else locale.all_cards_reviewed(), show_alert=True)
         return
 
+    card, total = first
+    budget = {"reviews_left": reviews_left, "new_left": new_left}
+    budget.update(spend_budget(budget, card))
+    card_prefetcher.start(callback.from_user.id, deck_id, until, card, new=due_kind(**budget))
+
     await state.set_state(ReviewSession.in_session)
     await state.update_data(
-        deck_id=deck_id, cards=[card.id for card in cards], current_index=0, easy=0, medium=0, hard=0, skipped=0
+        deck_id=deck_id,
+        card_id=card.id,
+        cursor=review_cursor(card),
+        until=until.isoformat(),
+        position=1,
+        total=total,
+        **budget,
+        easy=0,
+        medium=0,
+        hard=0,
+        skipped=0,
     )
 
-    card = cards[0]
-
-    if card.card_type == "variants":
-        variants_text = ""
-        for i in range(1, 5):
-            variant = getattr(card, f"variant_{i}", None)
-            if variant:
-                variants_text += f"{i}. {variant}\n"
-
-        await callback.message.edit_text(
-            locale.question_number(current=1, total=len(cards)) + "\n\n" + card.question + "\n\n" + variants_text,
-            reply_markup=get_variant_keyboard(card, locale),
-        )
-    else:
-        await callback.message.edit_text(
-            locale.question_number(current=1, total=len(cards)) + "\n\n" + card.question,
-            reply_markup=get_review_keyboard(locale),
-        )
+    text, keyboard = question_view(card, 1, total, locale)
+    await message_editor.edit_message(callback.message, text, reply_markup=keyboard)
 
     await callback.answer()
 
+    # Scheduling replaces the question's deadline in both backends, no separate cancel needed
     await start_timeout(
         callback.from_user.id,
         callback.message.chat.id,
         callback.message.message_id,
+        card.id,
         state,
-        session,
         locale,
         callback.bot,
+        session,
     )
 
 
-@router.callback_query(F.data == "show_answer", ReviewSession.in_session)
-async def show_answer(callback: CallbackQuery, state: FSMContext, session: AsyncSession, locale: TranslatorRunner):
+@callback_table.handler(ReviewCallback, ReviewSession.in_session, action=ReviewAction.SHOW_ANSWER)
+async def show_answer(
+    callback: CallbackQuery,
+    callback_data: ReviewCallback,
+    state: FSMContext,
+    session: AsyncSession,
+    locale: TranslatorRunner,
+):
     """Show answer to current card"""
-    cancel_timeout(callback.from_user.id)
-
     data = await state.get_data()
-    cards = data["cards"]
-    current_index = data["current_index"]
+    if callback_data.card_id != data.get("card_id"):
+        await callback.answer(locale.button_expired())
+        return
 
-    card_repo = CardRepository(session)
-    card = await card_repo.get_card_by_id(cards[current_index])
+    card = card_prefetcher.current(callback.from_user.id, data["card_id"])
+    if card is None:
+        card_repo = CardRepository(session)
+        card = await card_repo.get_card_by_id(data["card_id"])
 
     if not card:
         await callback.answer(locale.card_load_error(), show_alert=True)
         return
 
-    await callback.message.edit_text(
+    await message_editor.edit_message(
+        callback.message,
         locale.show_answer_text(question=card.question, answer=card.answer),
-        reply_markup=get_difficulty_keyboard(locale),
+        reply_markup=get_difficulty_keyboard(card.id, locale),
     )
     await callback.answer()
 
@@ -235,29 +353,34 @@ async def show_answer(callback: CallbackQuery, state: FSMContext, session: Async
         callback.from_user.id,
         callback.message.chat.id,
         callback.message.message_id,
+        card.id,
         state,
-        session,
         locale,
         callback.bot,
+        session,
     )
 
 
-@router.callback_query(F.data.startswith("variant_answer_"), ReviewSession.in_session)
+@callback_table.handler(VariantCallback, ReviewSession.in_session)
 async def check_variant_answer(
-    callback: CallbackQuery, state: FSMContext, session: AsyncSession, locale: TranslatorRunner
+    callback: CallbackQuery,
+    callback_data: VariantCallback,
+    state: FSMContext,
+    session: AsyncSession,
+    locale: TranslatorRunner,
 ):
     """Check variant answer"""
-    cancel_timeout(callback.from_user.id)
-
-    selected_variant = int(callback.data.split("_")[2])
-
     data = await state.get_data()
-    cards = data["cards"]
-    current_index = data["current_index"]
-    deck_id = data["deck_id"]
+    if callback_data.card_id != data.get("card_id"):
+        await callback.answer(locale.button_expired())
+        return
 
-    card_repo = CardRepository(session)
-    card = await card_repo.get_card_by_id(cards[current_index])
+    selected_variant = callback_data.variant
+
+    card = card_prefetcher.current(callback.from_user.id, data["card_id"])
+    if card is None:
+        card_repo = CardRepository(session)
+        card = await card_repo.get_card_by_id(data["card_id"])
 
     if not card:
         await callback.answer(locale.card_load_error(), show_alert=True)
@@ -267,12 +390,11 @@ async def check_variant_answer(
 
     difficulty = "easy" if is_correct else "hard"
 
-    await card_repo.update_card_review(card_id=card.id, difficulty=difficulty)
+    if not await grade_current_card(session, callback.from_user.id, data, difficulty):
+        await callback.answer(locale.button_expired())
+        return
 
-    stats_repo = StatisticsRepository(session)
-    await stats_repo.add_statistics(
-        user_id=callback.from_user.id, deck_id=deck_id, card_id=card.id, difficulty=difficulty
-    )
+    await cancel_timeout(callback.from_user.id, session)
 
     await state.update_data(**{difficulty: data[difficulty] + 1})
 
@@ -282,45 +404,54 @@ async def check_variant_answer(
     await next_card(callback, state, session, locale)
 
 
-@router.callback_query(F.data == "skip_card", ReviewSession.in_session)
-async def skip_card(callback: CallbackQuery, state: FSMContext, session: AsyncSession, locale: TranslatorRunner):
+@callback_table.handler(ReviewCallback, ReviewSession.in_session, action=ReviewAction.SKIP)
+async def skip_card(
+    callback: CallbackQuery,
+    callback_data: ReviewCallback,
+    state: FSMContext,
+    session: AsyncSession,
+    locale: TranslatorRunner,
+):
     """Skip current card"""
-    cancel_timeout(callback.from_user.id)
-
     data = await state.get_data()
-    current_index = data["current_index"]
-    cards = data["cards"]
-    deck_id = data["deck_id"]
+    if callback_data.card_id != data.get("card_id"):
+        await callback.answer(locale.button_expired())
+        return
+
+    await cancel_timeout(callback.from_user.id, session)
 
     stats_repo = StatisticsRepository(session)
     await stats_repo.add_statistics(
-        user_id=callback.from_user.id, deck_id=deck_id, card_id=cards[current_index], difficulty="skipped"
+        user_id=callback.from_user.id, deck_id=data["deck_id"], card_id=data["card_id"], difficulty="skipped"
     )
 
-    await state.update_data(skipped=data["skipped"] + 1)
+    await state.update_data(skipped=data.get("skipped", 0) + 1)
 
     await next_card(callback, state, session, locale)
 
 
-@router.callback_query(F.data.startswith("difficulty_"), ReviewSession.in_session)
-async def rate_difficulty(callback: CallbackQuery, state: FSMContext, session: AsyncSession, locale: TranslatorRunner):
+@callback_table.handler(GradeCallback, ReviewSession.in_session)
+async def rate_difficulty(
+    callback: CallbackQuery,
+    callback_data: GradeCallback,
+    state: FSMContext,
+    session: AsyncSession,
+    locale: TranslatorRunner,
+):
     """Rate answer difficulty"""
-    cancel_timeout(callback.from_user.id)
-
-    difficulty = callback.data.split("_")[1]  # easy, medium, hard
-
     data = await state.get_data()
-    current_index = data["current_index"]
-    cards = data["cards"]
-    deck_id = data["deck_id"]
+    if callback_data.card_id != data.get("card_id"):
+        await callback.answer(locale.button_expired())
+        return
 
-    card_repo = CardRepository(session)
-    await card_repo.update_card_review(card_id=cards[current_index], difficulty=difficulty)
+    difficulty = callback_data.difficulty
 
-    stats_repo = StatisticsRepository(session)
-    await stats_repo.add_statistics(
-        user_id=callback.from_user.id, deck_id=deck_id, card_id=cards[current_index], difficulty=difficulty
-    )
+    # The timer is cancelled only once this tap won the grade, it may already belong to the next card
+    if not await grade_current_card(session, callback.from_user.id, data, difficulty):
+        await callback.answer(locale.button_expired())
+        return
+
+    await cancel_timeout(callback.from_user.id, session)
 
     await state.update_data(**{difficulty: data[difficulty] + 1})
 
@@ -330,64 +461,48 @@ async def rate_difficulty(callback: CallbackQuery, state: FSMContext, session: A
 async def next_card(callback: CallbackQuery, state: FSMContext, session: AsyncSession, locale: TranslatorRunner):
     """Move to next card or finish session"""
     data = await state.get_data()
-    current_index = data["current_index"] + 1
-    cards = data["cards"]
     deck_id = data["deck_id"]
 
-    if current_index >= len(cards):
-        cancel_timeout(callback.from_user.id)
+    card = await next_due_card(callback.from_user.id, data)
 
-        total = len(cards)
-        easy = data["easy"]
-        medium = data["medium"]
-        hard = data["hard"]
-        skipped = data["skipped"]
+    if card is None:
+        await cancel_timeout(callback.from_user.id, session)
+        card_prefetcher.drop(callback.from_user.id)
 
         await state.clear()
 
         deck_repo = DeckRepository(session)
-        deck = await deck_repo.get_deck_by_id(deck_id)
-        has_cards = len(deck.cards) > 0
-
-        await callback.message.edit_text(
-            locale.session_complete(total=total, easy=easy, medium=medium, hard=hard, skipped=skipped),
+        has_cards = await deck_repo.deck_has_cards(deck_id)
+
+        await message_editor.edit_message(
+            callback.message,
+            locale.session_complete(
+                total=data["position"],
+                easy=data["easy"],
+                medium=data["medium"],
+                hard=data["hard"],
+                skipped=data["skipped"],
+            ),
             reply_markup=get_deck_actions_keyboard(deck_id, has_cards, locale),
         )
     else:
-        await state.update_data(current_index=current_index)
+        position = data["position"] + 1
+        await state.update_data(
+            card_id=card.id, cursor=review_cursor(card), position=position, **spend_budget(data, card)
+        )
 
-        card_repo = CardRepository(session)
-        card = await card_repo.get_card_by_id(cards[current_index])
-
-        if card.card_type == "variants":
-            variants_text = ""
-            for i in range(1, 5):
-                variant = getattr(card, f"variant_{i}", None)
-                if variant:
-                    variants_text += f"{i}. {variant}\n"
-
-            await callback.message.edit_text(
-                locale.question_number(current=current_index + 1, total=len(cards))
-                + "\n\n"
-                + card.question
-                + "\n\n"
-                + variants_text,
-                reply_markup=get_variant_keyboard(card, locale),
-            )
-        else:
-            await callback.message.edit_text(
-                locale.question_number(current=current_index + 1, total=len(cards)) + "\n\n" + card.question,
-                reply_markup=get_review_keyboard(locale),
-            )
+        text, keyboard = question_view(card, position, data["total"], locale)
+        await message_editor.edit_message(callback.message, text, reply_markup=keyboard)
 
         await start_timeout(
             callback.from_user.id,
             callback.message.chat.id,
             callback.message.message_id,
+            card.id,
             state,
-            session,
             locale,
             callback.bot,
+            session,
         )
 
     await callback.answer()
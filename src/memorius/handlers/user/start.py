@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from memorius.database.repositories import UserRepository
 from memorius.keyboards import get_contact_keyboard, get_main_menu_keyboard
+from memorius.utils import MenuAction, MenuCallback, callback_table
 
 router = Router()
 
@@ -40,7 +41,7 @@ async def process_contact(message: Message, session: AsyncSession, locale: Trans
         await message.answer(locale.registration_share_contact(), reply_markup=get_contact_keyboard(locale))
 
 
-@router.callback_query(F.data == "main_menu")
+@callback_table.handler(MenuCallback, action=MenuAction.MAIN)
 async def back_to_main_menu(callback: CallbackQuery, locale: TranslatorRunner):
     await callback.message.answer(locale.main_menu(), reply_markup=get_main_menu_keyboard(locale))
     await callback.message.delete()
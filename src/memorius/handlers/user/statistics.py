@@ -1,31 +1,27 @@
-from aiogram import F, Router
+from aiogram import Router
 from aiogram.types import CallbackQuery, Message
 from fluentogram import TranslatorRunner
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from memorius.database.repositories import StatisticsRepository
 from memorius.keyboards import get_statistics_period_keyboard
+from memorius.utils import MenuFilter, StatsCallback, callback_table
 
 router = Router()
 
 
-@router.message(
-    F.text.in_(
-        [
-            "📊 Статистика",  # Russian
-            "📊 Statistics",  # English
-        ]
-    )
-)
+@router.message(MenuFilter("statistics"))
 async def show_statistics_menu(message: Message, locale: TranslatorRunner):
     """Show statistics menu"""
     await message.answer(locale.select_period(), reply_markup=get_statistics_period_keyboard(locale))
 
 
-@router.callback_query(F.data.startswith("stats_"))
-async def show_statistics(callback: CallbackQuery, session: AsyncSession, locale: TranslatorRunner):
+@callback_table.handler(StatsCallback)
+async def show_statistics(
+    callback: CallbackQuery, callback_data: StatsCallback, session: AsyncSession, locale: TranslatorRunner
+):
     """Show statistics for selected period"""
-    days = int(callback.data.split("_")[1])
+    days = callback_data.days
 
     stats_repo = StatisticsRepository(session)
     stats = await stats_repo.get_user_statistics(user_id=callback.from_user.id, days=days)
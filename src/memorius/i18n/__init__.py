@@ -0,0 +1,8 @@
+from memorius.i18n.hub import CompiledBundle, LazyTranslatorHub, load_bundle, read_resources
+
+__all__ = [
+    "CompiledBundle",
+    "LazyTranslatorHub",
+    "load_bundle",
+    "read_resources",
+]
@@ -5,9 +5,11 @@ btn_back_menu = 🔙 Back to menu
 btn_back = 🔙 Back
 
 cards_short = cards
+due_short = due
 question_label = Question
 answer_label = Answer
 
 language = 🌐 Language
 select_language = Please select your language:
-language_changed = ✅ Language changed successfully!
\ No newline at end of file
+language_changed = ✅ Language changed successfully!
+button_expired = ⌛ This button is no longer active.
\ No newline at end of file
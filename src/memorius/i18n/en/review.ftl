@@ -1,4 +1,5 @@
 all_cards_reviewed = ✅ All cards have been studied! Come back later.
+daily_limit_reached = ⏳ Daily limit for this deck reached. Come back tomorrow!
 question_number = 📝 <b>Question {$current}/{$total}:</b>
 show_answer_text = 
     📝 <b>Question:</b>
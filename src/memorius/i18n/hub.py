@@ -0,0 +1,119 @@
+import hashlib
+import logging
+import marshal
+import os
+import sys
+from collections.abc import Iterable, Mapping
+from importlib import resources
+from importlib.metadata import version
+from pathlib import Path
+
+import babel
+from fluent_compiler.builtins import BUILTINS
+from fluent_compiler.bundle import FluentBundle
+from fluent_compiler.compiler import compile_messages, messages_to_module
+from fluent_compiler.resource import FtlResource
+from fluentogram import FluentTranslator, TranslatorHub, TranslatorRunner
+
+logger = logging.getLogger(__name__)
+
+
+def read_resources(locale: str) -> list[FtlResource]:
+    """FTL files of a locale, read from the installed package rather than the working directory"""
+    directory = resources.files(__package__).joinpath(locale)
+    entries = sorted((entry for entry in directory.iterdir() if entry.name.endswith(".ftl")), key=lambda e: e.name)
+    return [FtlResource(text=entry.read_text(encoding="utf-8"), filename=f"{locale}/{entry.name}") for entry in entries]
+
+
+class CompiledBundle(FluentBundle):
+    """FluentBundle made of already compiled message functions"""
+
+    def __init__(self, locale: str, message_functions: dict, errors: list | None = None):
+        self.locale = locale
+        self._compiled_messages = message_functions
+        self._compilation_errors = errors or []
+
+
+def _cache_key(bundle_locale: str, sources: list[FtlResource]) -> str:
+    digest = hashlib.sha256()
+    # Marshalled code is only valid for the interpreter and compiler that produced it
+    for part in (sys.version, version("fluent_compiler"), bundle_locale):
+        digest.update(part.encode() + b"\0")
+    for source in sources:
+        digest.update(source.filename.encode() + b"\0" + source.text.encode() + b"\0")
+    return digest.hexdigest()
+
+
+def _module_globals(bundle_locale: str) -> dict:
+    """Globals the compiled messages run with: runtime helpers, builtin functions and the plural rule"""
+    _, _, module_globals, _ = messages_to_module(
+        {}, babel.Locale.parse(bundle_locale.replace("-", "_")), functions=BUILTINS.copy()
+    )
+    return module_globals
+
+
+def load_bundle(bundle_locale: str, sources: list[FtlResource], cache_dir: Path | None = None) -> FluentBundle:
+    """Compile sources, reusing the compiled code stored in cache_dir when the sources did not change"""
+    path = cache_dir / f"{_cache_key(bundle_locale, sources)}.marshal" if cache_dir else None
+
+    if path and path.exists():
+        try:
+            code, names = marshal.loads(path.read_bytes())
+            module_globals = _module_globals(bundle_locale)
+            exec(code, module_globals)
+            return CompiledBundle(bundle_locale, {msg_id: module_globals[name] for msg_id, name in names.items()})
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable translation cache {path}: {e}")
+
+    compiled = compile_messages(bundle_locale, sources)
+    for msg_id, error in compiled.errors:
+        logger.warning(f"Translation error in {bundle_locale} {msg_id or ''}: {error}")
+
+    if path:
+        code = compile(compiled.module_ast, f"<{bundle_locale}>", "exec")
+        names = {msg_id: function.__name__ for msg_id, function in compiled.message_functions.items()}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(marshal.dumps((code, names)))
+            tmp.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not write translation cache {path}: {e}")
+
+    return CompiledBundle(bundle_locale, compiled.message_functions, compiled.errors)
+
+
+class LazyTranslatorHub(TranslatorHub):
+    """TranslatorHub that compiles a locale's bundle when the first user of that locale shows up
+
+    bundle_locales maps each locale directory in memorius/i18n to the CLDR locale used for its plural rules.
+    Only the root locale is compiled up front.
+    """
+
+    def __init__(
+        self,
+        locales_map: Mapping[str, str | Iterable[str]],
+        bundle_locales: Mapping[str, str],
+        root_locale: str = "en",
+        cache_dir: Path | None = None,
+    ):
+        self.bundle_locales = dict(bundle_locales)
+        self.cache_dir = cache_dir
+        super().__init__(locales_map, translators=[self._load(root_locale)], root_locale=root_locale)
+
+    def _load(self, locale: str) -> FluentTranslator:
+        bundle = load_bundle(self.bundle_locales[locale], read_resources(locale), self.cache_dir)
+        return FluentTranslator(locale=locale, translator=bundle)
+
+    def get_translator_by_locale(self, locale: str) -> TranslatorRunner:
+        locales_map = self.storage.get_locales_map()
+        missing = [
+            name
+            for name in locales_map.get(locale, ())
+            if name in self.bundle_locales and not self.storage.has_translator(name)
+        ]
+        if missing:
+            self.storage.add_translators(self._load(name) for name in missing)
+            # Rebuilds the language -> translators chains with the new translators in place
+            self.storage.set_locales_map(locales_map)
+        return super().get_translator_by_locale(locale)
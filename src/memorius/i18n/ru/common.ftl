@@ -5,9 +5,11 @@ btn_back_menu = 🔙 Вернуться в меню
 btn_back = 🔙 Назад
 
 cards_short = карт.
+due_short = к повт.
 question_label = Вопрос
 answer_label = Ответ
 
 language = 🌐 Язык
 select_language = Пожалуйста, выберите язык:
-language_changed = ✅ Язык успешно изменён!
\ No newline at end of file
+language_changed = ✅ Язык успешно изменён!
+button_expired = ⌛ Эта кнопка больше не активна.
\ No newline at end of file
@@ -1,4 +1,5 @@
 all_cards_reviewed = ✅ Все карточки изучены! Приходите позже.
+daily_limit_reached = ⏳ Дневной лимит по этой колоде исчерпан. Возвращайтесь завтра!
 question_number = 📝 <b>Вопрос {$current}/{$total}:</b>
 show_answer_text = 
     📝 <b>Вопрос:</b>
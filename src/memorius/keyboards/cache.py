@@ -0,0 +1,54 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from functools import wraps
+
+from fluentogram import TranslatorRunner
+
+
+def locale_key(locale: TranslatorRunner) -> Hashable:
+    """Locale a translator runner renders in: the one of its primary translator"""
+    return locale.translators[0].locale
+
+
+def per_locale[Markup](builder: Callable[[TranslatorRunner], Markup]) -> Callable[[TranslatorRunner], Markup]:
+    """Build a keyboard that depends only on the locale once per locale and hand out the shared markup
+
+    Markups are frozen models, so sharing one instance between updates is safe.
+    """
+    markups: dict[Hashable, Markup] = {}
+
+    @wraps(builder)
+    def wrapper(locale: TranslatorRunner) -> Markup:
+        key = locale_key(locale)
+        markup = markups.get(key)
+        if markup is None:
+            markup = markups[key] = builder(locale)
+        return markup
+
+    wrapper.cache_clear = markups.clear
+    return wrapper
+
+
+def locale_cache[Markup](maxsize: int) -> Callable[[Callable[..., Markup]], Callable[..., Markup]]:
+    """LRU memo for keyboards built from hashable positional arguments followed by the locale"""
+
+    def decorator(builder: Callable[..., Markup]) -> Callable[..., Markup]:
+        markups: OrderedDict[Hashable, Markup] = OrderedDict()
+
+        @wraps(builder)
+        def wrapper(*args) -> Markup:
+            *params, locale = args
+            key = (*params, locale_key(locale))
+            markup = markups.get(key)
+            if markup is None:
+                markup = markups[key] = builder(*args)
+                if len(markups) > maxsize:
+                    markups.popitem(last=False)
+            else:
+                markups.move_to_end(key)
+            return markup
+
+        wrapper.cache_clear = markups.clear
+        return wrapper
+
+    return decorator
@@ -2,14 +2,30 @@ from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from fluentogram import TranslatorRunner
 
+from memorius.utils import (
+    CardAction,
+    CardCallback,
+    CardTypeCallback,
+    DeckAction,
+    DeckCallback,
+    GradeCallback,
+    MenuAction,
+    MenuCallback,
+    ReviewAction,
+    ReviewCallback,
+    VariantCallback,
+)
 
-def get_card_list_keyboard(cards: list, action: str, deck_id: int, locale: TranslatorRunner) -> InlineKeyboardMarkup:
+
+def get_card_list_keyboard(
+    cards: list, action: CardAction, deck_id: int, locale: TranslatorRunner
+) -> InlineKeyboardMarkup:
     """Keyboard with list of cards for editing or deleting"""
     builder = InlineKeyboardBuilder()
     for card in cards:
         question_preview = card.question[:30] + "..." if len(card.question) > 30 else card.question
-        builder.button(text=question_preview, callback_data=f"{action}_card_id_{card.id}")
-    builder.button(text=locale.btn_back(), callback_data=f"deck_{deck_id}")
+        builder.button(text=question_preview, callback_data=CardCallback(action=action, card_id=card.id).pack())
+    builder.button(text=locale.btn_back(), callback_data=DeckCallback(action=DeckAction.SHOW, deck_id=deck_id).pack())
     builder.adjust(1)
     return builder.as_markup()
 
@@ -17,28 +33,34 @@ def get_card_list_keyboard(cards: list, action: str, deck_id: int, locale: Trans
 def get_card_type_keyboard(locale: TranslatorRunner) -> InlineKeyboardMarkup:
     """Keyboard for selecting card type"""
     keyboard = [
-        [InlineKeyboardButton(text=locale.card_type_text(), callback_data="card_type_text")],
-        [InlineKeyboardButton(text=locale.card_type_variants(), callback_data="card_type_variants")],
-        [InlineKeyboardButton(text=locale.btn_cancel(), callback_data="cancel")],
+        [InlineKeyboardButton(text=locale.card_type_text(), callback_data=CardTypeCallback(card_type="text").pack())],
+        [
+            InlineKeyboardButton(
+                text=locale.card_type_variants(), callback_data=CardTypeCallback(card_type="variants").pack()
+            )
+        ],
+        [InlineKeyboardButton(text=locale.btn_cancel(), callback_data=MenuCallback(action=MenuAction.CANCEL).pack())],
     ]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
-def get_review_keyboard(locale: TranslatorRunner) -> InlineKeyboardMarkup:
-    """Keyboard for card review session"""
+def get_review_keyboard(card_id: int, locale: TranslatorRunner) -> InlineKeyboardMarkup:
+    """Keyboard for reviewing a card"""
     builder = InlineKeyboardBuilder()
-    builder.button(text=locale.btn_show_answer(), callback_data="show_answer")
-    builder.button(text=locale.btn_skip(), callback_data="skip_card")
+    show = ReviewCallback(action=ReviewAction.SHOW_ANSWER, card_id=card_id).pack()
+    skip = ReviewCallback(action=ReviewAction.SKIP, card_id=card_id).pack()
+    builder.button(text=locale.btn_show_answer(), callback_data=show)
+    builder.button(text=locale.btn_skip(), callback_data=skip)
     builder.adjust(1)
     return builder.as_markup()
 
 
-def get_difficulty_keyboard(locale: TranslatorRunner) -> InlineKeyboardMarkup:
-    """Keyboard for rating answer difficulty"""
+def get_difficulty_keyboard(card_id: int, locale: TranslatorRunner) -> InlineKeyboardMarkup:
+    """Keyboard for rating the answer to a card"""
     builder = InlineKeyboardBuilder()
-    builder.button(text=locale.btn_easy(), callback_data="difficulty_easy")
-    builder.button(text=locale.btn_medium(), callback_data="difficulty_medium")
-    builder.button(text=locale.btn_hard(), callback_data="difficulty_hard")
+    builder.button(text=locale.btn_easy(), callback_data=GradeCallback(difficulty="easy", card_id=card_id).pack())
+    builder.button(text=locale.btn_medium(), callback_data=GradeCallback(difficulty="medium", card_id=card_id).pack())
+    builder.button(text=locale.btn_hard(), callback_data=GradeCallback(difficulty="hard", card_id=card_id).pack())
     builder.adjust(3)
     return builder.as_markup()
 
@@ -50,8 +72,10 @@ def get_variant_keyboard(card, locale: TranslatorRunner) -> InlineKeyboardMarkup
     for i in range(1, 5):
         variant = getattr(card, f"variant_{i}", None)
         if variant:
-            keyboard.append([InlineKeyboardButton(text=f"{i}", callback_data=f"variant_answer_{i}")])
+            callback_data = VariantCallback(variant=i, card_id=card.id).pack()
+            keyboard.append([InlineKeyboardButton(text=f"{i}", callback_data=callback_data)])
 
-    keyboard.append([InlineKeyboardButton(text=locale.skip_button(), callback_data="skip_card")])
+    skip = ReviewCallback(action=ReviewAction.SKIP, card_id=card.id).pack()
+    keyboard.append([InlineKeyboardButton(text=locale.skip_button(), callback_data=skip)])
 
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
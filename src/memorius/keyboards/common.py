@@ -2,9 +2,13 @@ from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from fluentogram import TranslatorRunner
 
+from memorius.keyboards.cache import per_locale
+from memorius.utils import MenuAction, MenuCallback
 
+
+@per_locale
 def get_cancel_keyboard(locale: TranslatorRunner) -> InlineKeyboardMarkup:
     """Keyboard with cancel button"""
     builder = InlineKeyboardBuilder()
-    builder.button(text=locale.btn_cancel(), callback_data="cancel")
+    builder.button(text=locale.btn_cancel(), callback_data=MenuCallback(action=MenuAction.CANCEL).pack())
     return builder.as_markup()
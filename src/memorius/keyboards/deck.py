@@ -2,34 +2,57 @@ from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from fluentogram import TranslatorRunner
 
+from memorius.keyboards.cache import locale_cache
+from memorius.utils import DeckAction, DeckCallback, MenuAction, MenuCallback
+
 
 def get_deck_list_keyboard(decks: list, locale: TranslatorRunner) -> InlineKeyboardMarkup:
-    """Keyboard with list of user's decks"""
+    """Keyboard with list of user's decks (rows from DeckRepository.get_deck_summaries)"""
     builder = InlineKeyboardBuilder()
     for deck in decks:
-        cards_count = len(deck.cards) if hasattr(deck, "cards") else 0
-        builder.button(text=f"{deck.name} ({cards_count} {locale.cards_short()})", callback_data=f"deck_{deck.id}")
-    builder.button(text=locale.btn_back_menu(), callback_data="main_menu")
+        counts = f"{deck.cards_count} {locale.cards_short()}"
+        if deck.due_count:
+            counts += f", {deck.due_count} {locale.due_short()}"
+        builder.button(
+            text=f"{deck.name} ({counts})", callback_data=DeckCallback(action=DeckAction.SHOW, deck_id=deck.id).pack()
+        )
+    builder.button(text=locale.btn_back_menu(), callback_data=MenuCallback(action=MenuAction.MAIN).pack())
     builder.adjust(1)
     return builder.as_markup()
 
 
+@locale_cache(maxsize=1024)
 def get_deck_actions_keyboard(deck_id: int, has_cards: bool, locale: TranslatorRunner) -> InlineKeyboardMarkup:
     """Keyboard with available actions for a deck"""
     builder = InlineKeyboardBuilder()
 
     if has_cards:
-        builder.button(text=locale.btn_open_deck(), callback_data=f"open_deck_{deck_id}")
-        builder.button(text=locale.btn_start_session(), callback_data=f"start_session_{deck_id}")
+        builder.button(
+            text=locale.btn_open_deck(), callback_data=DeckCallback(action=DeckAction.OPEN, deck_id=deck_id).pack()
+        )
+        builder.button(
+            text=locale.btn_start_session(),
+            callback_data=DeckCallback(action=DeckAction.START_SESSION, deck_id=deck_id).pack(),
+        )
 
-    builder.button(text=locale.btn_add_card(), callback_data=f"add_card_{deck_id}")
+    builder.button(
+        text=locale.btn_add_card(), callback_data=DeckCallback(action=DeckAction.ADD_CARD, deck_id=deck_id).pack()
+    )
 
     if has_cards:
-        builder.button(text=locale.btn_edit_card(), callback_data=f"edit_card_{deck_id}")
-        builder.button(text=locale.btn_delete_card(), callback_data=f"delete_card_{deck_id}")
+        builder.button(
+            text=locale.btn_edit_card(),
+            callback_data=DeckCallback(action=DeckAction.EDIT_CARDS, deck_id=deck_id).pack(),
+        )
+        builder.button(
+            text=locale.btn_delete_card(),
+            callback_data=DeckCallback(action=DeckAction.DELETE_CARDS, deck_id=deck_id).pack(),
+        )
 
-    builder.button(text=locale.btn_delete_deck(), callback_data=f"delete_deck_{deck_id}")
-    builder.button(text=locale.btn_back_to_decks(), callback_data="my_decks")
+    builder.button(
+        text=locale.btn_delete_deck(), callback_data=DeckCallback(action=DeckAction.DELETE, deck_id=deck_id).pack()
+    )
+    builder.button(text=locale.btn_back_to_decks(), callback_data=MenuCallback(action=MenuAction.DECKS).pack())
     builder.adjust(1)
     return builder.as_markup()
 
@@ -37,7 +60,9 @@ def get_deck_actions_keyboard(deck_id: int, has_cards: bool, locale: TranslatorR
 def get_after_create_deck_keyboard(deck_id: int, locale: TranslatorRunner) -> InlineKeyboardMarkup:
     """Keyboard shown after deck creation"""
     builder = InlineKeyboardBuilder()
-    builder.button(text=locale.btn_add_card(), callback_data=f"add_card_{deck_id}")
-    builder.button(text=locale.btn_back_menu(), callback_data="main_menu")
+    builder.button(
+        text=locale.btn_add_card(), callback_data=DeckCallback(action=DeckAction.ADD_CARD, deck_id=deck_id).pack()
+    )
+    builder.button(text=locale.btn_back_menu(), callback_data=MenuCallback(action=MenuAction.MAIN).pack())
     builder.adjust(1)
     return builder.as_markup()
@@ -2,7 +2,11 @@ from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeybo
 from aiogram.utils.keyboard import InlineKeyboardBuilder, ReplyKeyboardBuilder
 from fluentogram import TranslatorRunner
 
+from memorius.keyboards.cache import per_locale
+from memorius.utils import LanguageCallback, MenuAction, MenuCallback, StatsCallback
 
+
+@per_locale
 def get_main_menu_keyboard(locale: TranslatorRunner) -> ReplyKeyboardMarkup:
     """Main menu keyboard with primary bot functions"""
     builder = ReplyKeyboardBuilder()
@@ -15,20 +19,22 @@ def get_main_menu_keyboard(locale: TranslatorRunner) -> ReplyKeyboardMarkup:
     return builder.as_markup(resize_keyboard=True)
 
 
+@per_locale
 def get_back_to_menu_keyboard(locale: TranslatorRunner) -> InlineKeyboardMarkup:
     """Keyboard with back to menu button"""
     builder = InlineKeyboardBuilder()
-    builder.button(text=locale.btn_back_menu(), callback_data="main_menu")
+    builder.button(text=locale.btn_back_menu(), callback_data=MenuCallback(action=MenuAction.MAIN).pack())
     return builder.as_markup()
 
 
+@per_locale
 def get_statistics_period_keyboard(locale: TranslatorRunner) -> InlineKeyboardMarkup:
     """Keyboard for selecting statistics time period"""
     builder = InlineKeyboardBuilder()
-    builder.button(text=locale.btn_period_week(), callback_data="stats_7")
-    builder.button(text=locale.btn_period_month(), callback_data="stats_30")
-    builder.button(text=locale.btn_period_three_months(), callback_data="stats_90")
-    builder.button(text=locale.btn_back_menu(), callback_data="main_menu")
+    builder.button(text=locale.btn_period_week(), callback_data=StatsCallback(days=7).pack())
+    builder.button(text=locale.btn_period_month(), callback_data=StatsCallback(days=30).pack())
+    builder.button(text=locale.btn_period_three_months(), callback_data=StatsCallback(days=90).pack())
+    builder.button(text=locale.btn_back_menu(), callback_data=MenuCallback(action=MenuAction.MAIN).pack())
     builder.adjust(3, 1)
     return builder.as_markup()
 
@@ -37,9 +43,9 @@ def get_language_keyboard(locale: TranslatorRunner) -> InlineKeyboardMarkup:
     """Keyboard for language selection"""
     keyboard = [
         [
-            InlineKeyboardButton(text="🇷🇺 Русский", callback_data="lang_ru"),
-            InlineKeyboardButton(text="🇬🇧 English", callback_data="lang_en"),
+            InlineKeyboardButton(text="🇷🇺 Русский", callback_data=LanguageCallback(language_code="ru").pack()),
+            InlineKeyboardButton(text="🇬🇧 English", callback_data=LanguageCallback(language_code="en").pack()),
         ],
-        [InlineKeyboardButton(text=locale.btn_back_menu(), callback_data="main_menu")],
+        [InlineKeyboardButton(text=locale.btn_back_menu(), callback_data=MenuCallback(action=MenuAction.MAIN).pack())],
     ]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
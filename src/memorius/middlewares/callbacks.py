@@ -0,0 +1,34 @@
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import CallbackQuery
+
+
+class CallbackDataMiddleware(BaseMiddleware):
+    """Outer callback query middleware that finds the callback data class by prefix and unpacks it once
+
+    The callback dispatcher resolves the handler from the result and passes it on as callback_data.
+    """
+
+    def __init__(self, index: dict[str, type[CallbackData]]):
+        super().__init__()
+        self.index = index
+
+    async def __call__(
+        self,
+        handler: Callable[[CallbackQuery, dict[str, Any]], Awaitable[Any]],
+        event: CallbackQuery,
+        data: dict[str, Any],
+    ) -> Any:
+        callback_data = None
+        if event.data:
+            callback_type = self.index.get(event.data.partition(":")[0])
+            if callback_type is not None:
+                # Malformed payloads (e.g. buttons from an older layout) match no handler
+                with suppress(TypeError, ValueError):
+                    callback_data = callback_type.unpack(event.data)
+        data["callback_data"] = callback_data
+        return await handler(event, data)
@@ -19,6 +19,7 @@ class DatabaseMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict[str, Any],
     ) -> Any:
+        # AsyncSession checks a connection out of the pool only on its first query
         async with self.session_maker() as session:
             data["session"] = session
             return await handler(event, data)
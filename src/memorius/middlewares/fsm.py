@@ -0,0 +1,83 @@
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.types import TelegramObject
+
+_UNSET: Any = object()
+
+
+class BufferedFSMContext(FSMContext):
+    """FSMContext that reads storage at most once and keeps writes local until flush()"""
+
+    def __init__(self, storage: BaseStorage, key: StorageKey, state: str | None = _UNSET):
+        super().__init__(storage=storage, key=key)
+        self._state = state
+        self._data: dict[str, Any] | None = None
+        self._state_dirty = False
+        self._data_dirty = False
+
+    async def set_state(self, state: StateType = None) -> None:
+        self._state = state.state if isinstance(state, State) else state
+        self._state_dirty = True
+
+    async def get_state(self) -> str | None:
+        if self._state is _UNSET:
+            self._state = await self.storage.get_state(key=self.key)
+        return self._state
+
+    async def set_data(self, data: Mapping[str, Any]) -> None:
+        self._data = dict(data)
+        self._data_dirty = True
+
+    async def get_data(self) -> dict[str, Any]:
+        return (await self._load_data()).copy()
+
+    async def get_value(self, key: str, default: Any | None = None) -> Any | None:
+        return (await self._load_data()).get(key, default)
+
+    async def update_data(self, data: Mapping[str, Any] | None = None, **kwargs: Any) -> dict[str, Any]:
+        if data:
+            kwargs.update(data)
+        current = await self._load_data()
+        current.update(kwargs)
+        self._data_dirty = True
+        return current.copy()
+
+    async def flush(self) -> None:
+        """Write buffered changes back to storage"""
+        if self._state_dirty:
+            await self.storage.set_state(key=self.key, state=self._state)
+            self._state_dirty = False
+        if self._data_dirty:
+            await self.storage.set_data(key=self.key, data=self._data)
+            self._data_dirty = False
+
+    async def _load_data(self) -> dict[str, Any]:
+        if self._data is None:
+            self._data = await self.storage.get_data(key=self.key)
+        return self._data
+
+
+class BufferedStateMiddleware(BaseMiddleware):
+    """Middleware swapping the update's FSMContext for a BufferedFSMContext flushed once after the handler"""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        context: FSMContext | None = data.get("state")
+        if context is None:
+            return await handler(event, data)
+
+        state = BufferedFSMContext(context.storage, context.key, data.get("raw_state", _UNSET))
+        data["state"] = state
+        try:
+            return await handler(event, data)
+        finally:
+            await state.flush()
@@ -0,0 +1,22 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import Message
+
+
+class MenuMiddleware(BaseMiddleware):
+    """Outer message middleware resolving menu button labels to their action with a single lookup"""
+
+    def __init__(self, index: dict[str, str]):
+        super().__init__()
+        self.index = index
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: dict[str, Any],
+    ) -> Any:
+        data["menu_action"] = self.index.get(event.text) if event.text else None
+        return await handler(event, data)
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from memorius.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Set inside bulk_sends(); such requests give way to queued interactive ones
+_bulk: ContextVar[bool] = ContextVar("bulk_sends", default=False)
+
+
+@contextmanager
+def bulk_sends() -> Iterator[None]:
+    """Send requests made in this block (and in tasks started from it) in the low priority lane"""
+    token = _bulk.set(True)
+    try:
+        yield
+    finally:
+        _bulk.reset(token)
+
+
+class TokenBucket:
+    """Holds up to capacity tokens, refilled continuously at rate tokens per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = monotonic()
+        self.blocked_until = 0.0
+
+    def delay(self) -> float:
+        """Seconds until a token can be taken, 0 if one can be taken now"""
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        """Hand out no tokens for the next seconds"""
+        self.blocked_until = max(self.blocked_until, monotonic() + seconds)
+
+
+class ThrottlingRequestMiddleware(BaseRequestMiddleware):
+    """Keeps requests addressed to a chat under Telegram's global and per-chat limits, retries flood waits
+
+    Requests without a chat_id (getUpdates, answerCallbackQuery, ...) pass through untouched.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        chat_burst: float = 3,
+        retries: int = 3,
+        max_chats: int = 10_000,
+    ):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.chat_burst = chat_burst
+        self.retries = retries
+        # Buckets idle for a minute are full again, so forgetting them changes nothing
+        self._chats = TTLCache(maxsize=max_chats, ttl=60)
+        self._queued = 0
+
+    def chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Private chats have positive ids; groups, channels and @usernames get the group limit
+            rate = self.chat_rate if isinstance(chat_id, int) and chat_id > 0 else self.group_rate
+            bucket = TokenBucket(rate, max(1.0, self.chat_burst * min(rate, 1.0)))
+        self._chats.set(chat_id, bucket)
+        return bucket
+
+    async def acquire(self, chat_id: int | str) -> None:
+        """Wait for a token from both the global and the chat bucket"""
+        bulk = _bulk.get()
+        chat = self.chat_bucket(chat_id)
+        queued = False
+        try:
+            while True:
+                global_wait = self.global_bucket.delay()
+                wait = max(global_wait, chat.delay())
+                if bulk and self._queued:
+                    wait = max(wait, 1 / self.global_bucket.rate)
+                if wait <= 0:
+                    self.global_bucket.take()
+                    chat.take()
+                    return
+
+                # An interactive request held back by the global limit keeps bulk requests waiting
+                if not bulk and not queued and global_wait > 0:
+                    queued = True
+                    self._queued += 1
+                await asyncio.sleep(wait)
+        finally:
+            if queued:
+                self._queued -= 1
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        attempt = 0
+        while True:
+            await self.acquire(chat_id)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+                logger.warning(
+                    f"Flood control on {method.__api_method__} to chat {chat_id}, retrying in {e.retry_after}s"
+                )
+                self.chat_bucket(chat_id).block(e.retry_after)
@@ -7,6 +7,7 @@ from aiogram.types import TelegramObject, User
 from fluentogram import TranslatorHub
 
 from memorius.database.repositories import UserRepository
+from memorius.utils.cache import user_profile_cache
 
 router = Router()
 
@@ -23,17 +24,20 @@ class TranslateMiddleware(BaseMiddleware):
 
         language_code = "ru"
 
-        if user and session:
+        profile = user_profile_cache.get(user.id) if user else None
+        if user and not profile and session:
             user_repo = UserRepository(session)
             with suppress(Exception):
-                db_user = await user_repo.get_or_create_user(
+                await user_repo.get_or_create_user(
                     user_id=user.id,
                     username=user.username,
                     first_name=user.first_name,
                     last_name=user.last_name,
                 )
-                if db_user.language_code:
-                    language_code = db_user.language_code
+                profile = user_profile_cache.get(user.id)
+
+        if profile and profile.language_code:
+            language_code = profile.language_code
 
         # Simplified nested ifs
         if user and not language_code and user.language_code:
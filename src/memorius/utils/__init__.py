@@ -1,10 +1,62 @@
+from memorius.utils.cache import TTLCache, UserProfile, user_profile_cache
+from memorius.utils.callbacks import (
+    CALLBACK_TYPES,
+    CallbackTable,
+    CardAction,
+    CardCallback,
+    CardTypeCallback,
+    DeckAction,
+    DeckCallback,
+    GradeCallback,
+    LanguageCallback,
+    MenuAction,
+    MenuCallback,
+    ReviewAction,
+    ReviewCallback,
+    StatsCallback,
+    VariantCallback,
+    build_callback_index,
+    callback_table,
+)
+from memorius.utils.editor import MessageEditor, message_editor
+from memorius.utils.isolation import UserEventIsolation, event_isolation
+from memorius.utils.menu import MENU_ACTIONS, MenuFilter, build_menu_index
 from memorius.utils.states import CreateCard, CreateDeck, EditCard, ReviewSession
+from memorius.utils.timer_wheel import TimerWheel
 from memorius.utils.validators import validate_deck_name
 
 __all__ = [
+    "CALLBACK_TYPES",
+    "MENU_ACTIONS",
+    "CallbackTable",
+    "CardAction",
+    "CardCallback",
+    "CardTypeCallback",
     "CreateDeck",
     "CreateCard",
+    "DeckAction",
+    "DeckCallback",
     "EditCard",
+    "GradeCallback",
+    "LanguageCallback",
+    "MenuAction",
+    "MenuCallback",
+    "MenuFilter",
+    "MessageEditor",
+    "ReviewAction",
+    "ReviewCallback",
     "ReviewSession",
+    "StatsCallback",
+    "TimerWheel",
+    "TTLCache",
+    "UserEventIsolation",
+    "UserProfile",
+    "VariantCallback",
+    "build_callback_index",
+    "build_menu_index",
+    "callback_table",
+    "event_isolation",
+    "message_editor",
+    "user_profile_cache",
     "validate_deck_name",
 ]
@@ -0,0 +1,133 @@
+from collections.abc import Callable
+from enum import StrEnum
+from typing import Any, Literal
+
+from aiogram.dispatcher.event.handler import FilterObject, HandlerObject
+from aiogram.filters.callback_data import CallbackData
+
+# Callback data is packed as "<prefix>:<field>:..."; prefixes and action values are kept to a letter or two
+
+
+class MenuAction(StrEnum):
+    MAIN = "m"
+    DECKS = "d"
+    CANCEL = "c"
+
+
+class MenuCallback(CallbackData, prefix="m"):
+    action: MenuAction
+
+
+class DeckAction(StrEnum):
+    SHOW = "s"
+    OPEN = "o"
+    DELETE = "x"
+    ADD_CARD = "a"
+    EDIT_CARDS = "e"
+    DELETE_CARDS = "r"
+    START_SESSION = "go"
+
+
+class DeckCallback(CallbackData, prefix="d"):
+    action: DeckAction
+    deck_id: int
+
+
+class CardAction(StrEnum):
+    EDIT = "e"
+    DELETE = "x"
+
+
+class CardCallback(CallbackData, prefix="c"):
+    action: CardAction
+    card_id: int
+
+
+class CardTypeCallback(CallbackData, prefix="t"):
+    card_type: Literal["text", "variants"]
+
+
+class ReviewAction(StrEnum):
+    SHOW_ANSWER = "a"
+    SKIP = "s"
+
+
+# Review buttons carry the card they were shown for, so a late or repeated tap cannot act on the card after it
+
+
+class ReviewCallback(CallbackData, prefix="r"):
+    action: ReviewAction
+    card_id: int
+
+
+class GradeCallback(CallbackData, prefix="g"):
+    difficulty: Literal["easy", "medium", "hard"]
+    card_id: int
+
+
+class VariantCallback(CallbackData, prefix="v"):
+    variant: int
+    card_id: int
+
+
+class StatsCallback(CallbackData, prefix="s"):
+    days: int
+
+
+class LanguageCallback(CallbackData, prefix="l"):
+    language_code: str
+
+
+CALLBACK_TYPES: tuple[type[CallbackData], ...] = (
+    MenuCallback,
+    DeckCallback,
+    CardCallback,
+    CardTypeCallback,
+    ReviewCallback,
+    GradeCallback,
+    VariantCallback,
+    StatsCallback,
+    LanguageCallback,
+)
+
+
+def build_callback_index(types: tuple[type[CallbackData], ...] = CALLBACK_TYPES) -> dict[str, type[CallbackData]]:
+    """Map each callback prefix to its callback data class"""
+    index = {}
+    for callback_type in types:
+        if callback_type.__prefix__ in index:
+            raise ValueError(f"Callback prefix {callback_type.__prefix__!r} is used twice")
+        index[callback_type.__prefix__] = callback_type
+    return index
+
+
+class CallbackTable:
+    """Dispatch table resolving a callback's handler from its data type and action with one dict lookup
+
+    Each (callback type, action) pair has exactly one handler; filters passed with it (FSM states) are checked
+    only for the resolved handler, so a callback query never walks the other handlers.
+    """
+
+    def __init__(self):
+        self._handlers: dict[tuple[type[CallbackData], Any], HandlerObject] = {}
+
+    def handler(self, callback_type: type[CallbackData], *filters: Any, action: Any = None) -> Callable:
+        """Register the decorated function as the handler of callback_type (and action, for types that have one)"""
+
+        def register(callback: Callable) -> Callable:
+            key = (callback_type, action)
+            if key in self._handlers:
+                raise ValueError(f"{callback_type.__name__} {action!r} already has a handler")
+            self._handlers[key] = HandlerObject(callback=callback, filters=[FilterObject(f) for f in filters])
+            return callback
+
+        return register
+
+    def resolve(self, callback_data: CallbackData | None) -> HandlerObject | None:
+        """Handler registered for the parsed callback data, if any"""
+        if callback_data is None:
+            return None
+        return self._handlers.get((type(callback_data), getattr(callback_data, "action", None)))
+
+
+callback_table = CallbackTable()
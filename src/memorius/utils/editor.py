@@ -0,0 +1,100 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from functools import partial
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup, MaybeInaccessibleMessage, Message
+
+from memorius.utils.cache import TTLCache
+
+MessageKey = tuple[int, int]
+View = tuple[str, InlineKeyboardMarkup | None]
+
+
+class MessageEditor:
+    """Edits messages only when their content changes, coalescing edits queued for the same message
+
+    The last render of each (chat, message) is remembered: identical edits are skipped, a changed keyboard
+    alone is sent as a markup-only edit, and when several edits wait on one message only the latest is sent.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 3600.0):
+        self._views = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._pending: dict[MessageKey, View] = {}
+        self._locks: dict[MessageKey, asyncio.Lock] = {}
+        self._waiters: dict[MessageKey, int] = {}
+
+    async def edit(
+        self, bot: Bot, chat_id: int, message_id: int, text: str, reply_markup: InlineKeyboardMarkup | None = None
+    ) -> None:
+        """Edit a message by id, compared against the last render sent through the editor"""
+        await self._edit(
+            (chat_id, message_id),
+            (text, reply_markup),
+            partial(bot.edit_message_text, chat_id=chat_id, message_id=message_id),
+            partial(bot.edit_message_reply_markup, chat_id=chat_id, message_id=message_id),
+        )
+
+    async def edit_message(
+        self, message: MaybeInaccessibleMessage, text: str, reply_markup: InlineKeyboardMarkup | None = None
+    ) -> None:
+        """Edit a message from an update, compared against its content as the update reported it"""
+        key = (message.chat.id, message.message_id)
+        if not isinstance(message, Message):
+            # Too old for the update to carry its content, so there is nothing reliable to diff against
+            self._views.pop(key)
+            await self.edit(message.bot, message.chat.id, message.message_id, text, reply_markup)
+            return
+        # The update is authoritative: the message may have been edited elsewhere since our last render
+        self._views.set(key, (message.html_text, message.reply_markup))
+        await self._edit(key, (text, reply_markup), message.edit_text, message.edit_reply_markup)
+
+    async def _edit(
+        self,
+        key: MessageKey,
+        view: View,
+        edit_text: Callable[..., Awaitable],
+        edit_markup: Callable[..., Awaitable],
+    ) -> None:
+        self._pending[key] = view
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            async with lock:
+                view = self._pending.pop(key, None)
+                if view is None:
+                    # An edit queued after this one was sent in its place
+                    return
+                await self._send(key, view, edit_text, edit_markup)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                del self._locks[key]
+
+    async def _send(
+        self,
+        key: MessageKey,
+        view: View,
+        edit_text: Callable[..., Awaitable],
+        edit_markup: Callable[..., Awaitable],
+    ) -> None:
+        text, reply_markup = view
+        last = self._views.get(key)
+        if last == view:
+            return
+
+        try:
+            if last is not None and last[0] == text:
+                await edit_markup(reply_markup=reply_markup)
+            else:
+                await edit_text(text=text, reply_markup=reply_markup)
+        except TelegramBadRequest as e:
+            if "message is not modified" not in e.message:
+                self._views.pop(key)
+                raise
+        self._views.set(key, view)
+
+
+message_editor = MessageEditor()
@@ -0,0 +1,40 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
+from aiogram.fsm.storage.base import BaseEventIsolation, StorageKey
+
+
+class UserEventIsolation(BaseEventIsolation):
+    """Serializes events per FSM key (bot, chat, user) while different users run concurrently
+
+    Unlike aiogram's SimpleEventIsolation, a lock is dropped as soon as nobody holds or waits for it,
+    so idle users cost nothing.
+    """
+
+    def __init__(self):
+        self._locks: dict[StorageKey, tuple[asyncio.Lock, list[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None]:
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = (asyncio.Lock(), [0])
+        lock, users = entry
+        users[0] += 1
+        try:
+            async with lock:
+                yield
+        finally:
+            users[0] -= 1
+            if not users[0]:
+                del self._locks[key]
+
+    async def close(self) -> None:
+        self._locks.clear()
+
+
+event_isolation = UserEventIsolation()
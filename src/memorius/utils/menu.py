@@ -0,0 +1,38 @@
+from collections.abc import Iterable
+
+from aiogram.filters import Filter
+from aiogram.types import Message
+from fluent.syntax import FluentParser, ast
+
+from memorius.i18n import read_resources
+
+# Main menu buttons; each action is also the Fluent message id of its label
+MENU_ACTIONS = ("create_deck", "my_decks", "statistics", "help", "language")
+
+
+def build_menu_index(locales: Iterable[str]) -> dict[str, str]:
+    """Map the menu button labels of the given locale directories to their action
+
+    Labels are read from the raw FTL sources, so building the index does not compile any bundle.
+    """
+    parser = FluentParser()
+    index = {}
+    for locale in locales:
+        for resource in read_resources(locale):
+            for entry in parser.parse(resource.text).body:
+                if not isinstance(entry, ast.Message) or entry.id.name not in MENU_ACTIONS or entry.value is None:
+                    continue
+                # Menu labels are plain text; a label with placeables could not be matched against anyway
+                if all(isinstance(element, ast.TextElement) for element in entry.value.elements):
+                    index["".join(element.value for element in entry.value.elements)] = entry.id.name
+    return index
+
+
+class MenuFilter(Filter):
+    """Matches messages whose text is the label of a main menu button, in any language"""
+
+    def __init__(self, action: str):
+        self.action = action
+
+    async def __call__(self, message: Message, menu_action: str | None = None) -> bool:
+        return menu_action == self.action
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from math import ceil
+from time import monotonic
+
+logger = logging.getLogger(__name__)
+
+
+class TimerWheel:
+    """Hashed timer wheel: a single task drives every deadline, schedule and cancel are O(1)
+
+    Each timer is keyed (one timer per key); rescheduling a key replaces its timer.
+    Callbacks are coroutine functions started as separate tasks when their deadline passes.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self._slots: list[dict[Hashable, list]] = [{} for _ in range(slots)]
+        self._index: dict[Hashable, int] = {}
+        self._cursor = 0
+        self._task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._index
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[[], Awaitable]) -> None:
+        """Fire callback after delay seconds (rounded up to the tick), replacing any timer under key"""
+        self.cancel(key)
+
+        ticks = max(1, ceil(delay / self.tick))
+        slot = (self._cursor + ticks) % len(self._slots)
+        rounds = (ticks - 1) // len(self._slots)
+        self._slots[slot][key] = [rounds, callback]
+        self._index[key] = slot
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel timer under key, returns whether there was one"""
+        slot = self._index.pop(key, None)
+        if slot is None:
+            return False
+        del self._slots[slot][key]
+        return True
+
+    async def stop(self) -> None:
+        """Drop pending timers and stop the driver task"""
+        for bucket in self._slots:
+            bucket.clear()
+        self._index.clear()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        next_tick = monotonic()
+        while self._index:
+            next_tick += self.tick
+            await asyncio.sleep(max(0.0, next_tick - monotonic()))
+            self._advance()
+
+    def _advance(self) -> None:
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        bucket = self._slots[self._cursor]
+
+        for key, entry in list(bucket.items()):
+            if entry[0] > 0:
+                entry[0] -= 1
+                continue
+
+            del bucket[key]
+            del self._index[key]
+            task = asyncio.create_task(entry[1]())
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error("Timer callback failed", exc_info=task.exception())
@@ -0,0 +1,55 @@
+import asyncio
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from memorius.config import settings
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """Webhook handler that processes at most max_in_flight updates at once
+
+    Each request is answered once its update is handled, so requests beyond the limit wait for a slot
+    and Telegram slows down delivery instead of the process piling up unbounded work.
+    """
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, max_in_flight: int, **kwargs: Any):
+        super().__init__(dispatcher=dispatcher, bot=bot, handle_in_background=False, **kwargs)
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        bot = await self.resolve_bot(request)
+        # Refuse forged requests before they can take a slot from real updates
+        if not self.verify_secret(request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), bot):
+            return web.Response(body="Unauthorized", status=401)
+        async with self._slots:
+            return await self._handle_request(bot=bot, request=request)
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    """Register the webhook with Telegram and serve pushed updates until cancelled"""
+    app = web.Application()
+    BoundedRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        max_in_flight=settings.UPDATES_CONCURRENCY_LIMIT,
+        secret_token=settings.WEBHOOK_SECRET,
+    ).register(app, path=settings.WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+
+    await bot.set_webhook(
+        url=settings.WEBHOOK_BASE_URL.rstrip("/") + settings.WEBHOOK_PATH,
+        secret_token=settings.WEBHOOK_SECRET,
+        allowed_updates=dp.resolve_used_update_types(),
+        max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+    )
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host=settings.WEBHOOK_HOST, port=settings.WEBHOOK_PORT).start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
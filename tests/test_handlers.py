@@ -1,10 +1,15 @@
+import asyncio
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from aiogram.exceptions import TelegramRetryAfter
 from aiogram.fsm.context import FSMContext
+from aiogram.methods import SendMessage
 from aiogram.types import CallbackQuery, Chat, InlineKeyboardMarkup, Message, User
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from memorius.handlers.user.callbacks import dispatch_callback, expired_button
 from memorius.handlers.user.card import (
     add_card_correct_variant,
     add_card_finish,
@@ -16,17 +21,42 @@ from memorius.handlers.user.card import (
 from memorius.handlers.user.deck import (
     create_deck_finish,
     create_deck_start,
+    delete_deck_confirm,
     show_deck_actions,
     show_my_decks,
 )
 from memorius.handlers.user.session import (
+    _expire_card,
     check_variant_answer,
+    next_card,
     rate_difficulty,
     show_answer,
     skip_card,
     start_session,
 )
-from memorius.utils import CreateCard, CreateDeck, ReviewSession
+from memorius.middlewares.callbacks import CallbackDataMiddleware
+from memorius.middlewares.fsm import BufferedStateMiddleware
+from memorius.middlewares.menu import MenuMiddleware
+from memorius.middlewares.throttling import ThrottlingRequestMiddleware, bulk_sends
+from memorius.middlewares.translate import TranslateMiddleware
+from memorius.utils import (
+    CardTypeCallback,
+    CreateCard,
+    CreateDeck,
+    DeckAction,
+    DeckCallback,
+    GradeCallback,
+    MenuFilter,
+    ReviewAction,
+    ReviewCallback,
+    ReviewSession,
+    UserProfile,
+    VariantCallback,
+    build_callback_index,
+    build_menu_index,
+    callback_table,
+    user_profile_cache,
+)
 
 
 @pytest.fixture
@@ -55,9 +85,12 @@ def mock_message(mock_user, mock_chat):
     message.from_user = mock_user
     message.chat = mock_chat
     message.text = "Test message"
+    message.html_text = "Test message"
+    message.reply_markup = None
     message.message_id = 1
     message.answer = AsyncMock()
     message.edit_text = AsyncMock()
+    message.edit_reply_markup = AsyncMock()
     message.delete = AsyncMock()
     return message
 
@@ -134,10 +167,10 @@ class TestCardHandlers:
     @pytest.mark.asyncio
     async def test_add_card_start(self, mock_callback, mock_state, mock_locale, mock_keyboard):
         """Test starting card creation"""
-        mock_callback.data = "add_card_123"
-
         with patch("memorius.handlers.user.card.get_card_type_keyboard", return_value=mock_keyboard):
-            await add_card_start(mock_callback, mock_state, mock_locale)
+            await add_card_start(
+                mock_callback, DeckCallback(action=DeckAction.ADD_CARD, deck_id=123), mock_state, mock_locale
+            )
 
             mock_state.update_data.assert_called_once_with(deck_id=123)
             mock_state.set_state.assert_called_once_with(CreateCard.waiting_for_card_type)
@@ -147,10 +180,8 @@ class TestCardHandlers:
     @pytest.mark.asyncio
     async def test_add_card_type_selected_text(self, mock_callback, mock_state, mock_locale, mock_keyboard):
         """Test selecting text card type"""
-        mock_callback.data = "card_type_text"
-
         with patch("memorius.handlers.user.card.get_cancel_keyboard", return_value=mock_keyboard):
-            await add_card_type_selected(mock_callback, mock_state, mock_locale)
+            await add_card_type_selected(mock_callback, CardTypeCallback(card_type="text"), mock_state, mock_locale)
 
             mock_state.update_data.assert_called_once_with(card_type="text")
             mock_state.set_state.assert_called_once_with(CreateCard.waiting_for_question)
@@ -159,10 +190,8 @@ class TestCardHandlers:
     @pytest.mark.asyncio
     async def test_add_card_type_selected_variants(self, mock_callback, mock_state, mock_locale, mock_keyboard):
         """Test selecting variants card type"""
-        mock_callback.data = "card_type_variants"
-
         with patch("memorius.handlers.user.card.get_cancel_keyboard", return_value=mock_keyboard):
-            await add_card_type_selected(mock_callback, mock_state, mock_locale)
+            await add_card_type_selected(mock_callback, CardTypeCallback(card_type="variants"), mock_state, mock_locale)
 
             mock_state.update_data.assert_called_once_with(card_type="variants")
             mock_state.set_state.assert_called_once_with(CreateCard.waiting_for_question)
@@ -208,16 +237,14 @@ class TestCardHandlers:
             mock_card_repo.create_card = AsyncMock()
             mock_card_repo_class.return_value = mock_card_repo
 
-            mock_deck = MagicMock()
-            mock_deck.cards = [MagicMock()]
-
             mock_deck_repo = AsyncMock()
-            mock_deck_repo.get_deck_by_id = AsyncMock(return_value=mock_deck)
+            mock_deck_repo.deck_has_cards = AsyncMock(return_value=True)
             mock_deck_repo_class.return_value = mock_deck_repo
 
             await add_card_finish(mock_message, mock_state, mock_session, mock_locale)
 
             mock_card_repo.create_card.assert_called_once()
+            mock_deck_repo.deck_has_cards.assert_called_once_with(123)
             mock_state.clear.assert_called_once()
             mock_message.answer.assert_called_once()
 
@@ -281,11 +308,8 @@ class TestCardHandlers:
             mock_card_repo.create_card = AsyncMock()
             mock_card_repo_class.return_value = mock_card_repo
 
-            mock_deck = MagicMock()
-            mock_deck.cards = [MagicMock()]
-
             mock_deck_repo = AsyncMock()
-            mock_deck_repo.get_deck_by_id = AsyncMock(return_value=mock_deck)
+            mock_deck_repo.deck_has_cards = AsyncMock(return_value=True)
             mock_deck_repo_class.return_value = mock_deck_repo
 
             await add_card_correct_variant(mock_message, mock_state, mock_session, mock_locale)
@@ -378,7 +402,7 @@ class TestDeckHandlers:
             patch("memorius.handlers.user.deck.get_deck_list_keyboard", return_value=mock_keyboard),
         ):
             mock_deck_repo = AsyncMock()
-            mock_deck_repo.get_user_decks = AsyncMock(
+            mock_deck_repo.get_deck_summaries = AsyncMock(
                 return_value=[MagicMock(id=1, name="Deck 1"), MagicMock(id=2, name="Deck 2")]
             )
             mock_deck_repo_class.return_value = mock_deck_repo
@@ -395,7 +419,7 @@ class TestDeckHandlers:
             patch("memorius.handlers.user.deck.get_back_to_menu_keyboard", return_value=mock_keyboard),
         ):
             mock_deck_repo = AsyncMock()
-            mock_deck_repo.get_user_decks = AsyncMock(return_value=[])
+            mock_deck_repo.get_deck_summaries = AsyncMock(return_value=[])
             mock_deck_repo_class.return_value = mock_deck_repo
 
             await show_my_decks(mock_message, mock_session, mock_locale)
@@ -405,21 +429,22 @@ class TestDeckHandlers:
     @pytest.mark.asyncio
     async def test_show_deck_actions(self, mock_callback, mock_session, mock_locale, mock_keyboard):
         """Test showing deck actions"""
-        mock_callback.data = "deck_123"
-
         with (
             patch("memorius.handlers.user.deck.DeckRepository") as mock_deck_repo_class,
             patch("memorius.handlers.user.deck.get_deck_actions_keyboard", return_value=mock_keyboard),
         ):
             mock_deck = MagicMock()
             mock_deck.name = "Test Deck"
-            mock_deck.cards = [MagicMock(), MagicMock()]
+            mock_deck.cards_count = 2
+            mock_deck.has_cards = True
 
             mock_deck_repo = AsyncMock()
-            mock_deck_repo.get_deck_by_id = AsyncMock(return_value=mock_deck)
+            mock_deck_repo.get_deck_header = AsyncMock(return_value=mock_deck)
             mock_deck_repo_class.return_value = mock_deck_repo
 
-            await show_deck_actions(mock_callback, mock_session, mock_locale)
+            await show_deck_actions(
+                mock_callback, DeckCallback(action=DeckAction.SHOW, deck_id=123), mock_session, mock_locale
+            )
 
             mock_callback.message.edit_text.assert_called_once()
             mock_callback.answer.assert_called_once()
@@ -431,10 +456,10 @@ class TestSessionHandlers:
     @pytest.mark.asyncio
     async def test_start_session_with_cards(self, mock_callback, mock_state, mock_session, mock_locale, mock_keyboard):
         """Test starting review session with available cards"""
-        mock_callback.data = "start_session_123"
-
         with (
             patch("memorius.handlers.user.session.CardRepository") as mock_card_repo_class,
+            patch("memorius.handlers.user.session.ReviewRepository") as mock_review_repo_class,
+            patch("memorius.handlers.user.session.card_prefetcher") as mock_prefetcher,
             patch("memorius.handlers.user.session.start_timeout") as mock_timeout,
             patch("memorius.handlers.user.session.get_review_keyboard", return_value=mock_keyboard),
         ):
@@ -442,37 +467,79 @@ class TestSessionHandlers:
             mock_card.id = 1
             mock_card.card_type = "text"
             mock_card.question = "Test question"
+            mock_card.first_reviewed_at = None
+
+            mock_review_repo_class.return_value.get_review_budget = AsyncMock(return_value=(200, 20))
 
             mock_card_repo = AsyncMock()
-            mock_card_repo.get_cards_for_review = AsyncMock(return_value=[mock_card])
+            mock_card_repo.get_first_due_card = AsyncMock(return_value=(mock_card, 1))
             mock_card_repo_class.return_value = mock_card_repo
 
-            await start_session(mock_callback, mock_state, mock_session, mock_locale)
+            await start_session(
+                mock_callback,
+                DeckCallback(action=DeckAction.START_SESSION, deck_id=123),
+                mock_state,
+                mock_session,
+                mock_locale,
+            )
 
+            mock_card_repo.get_first_due_card.assert_called_once()
             mock_state.set_state.assert_called_once_with(ReviewSession.in_session)
             mock_state.update_data.assert_called_once()
+            assert mock_state.update_data.call_args.kwargs["new_left"] == 19
+            mock_prefetcher.start.assert_called_once()
             mock_callback.message.edit_text.assert_called_once()
             mock_timeout.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_start_session_no_cards(self, mock_callback, mock_state, mock_session, mock_locale):
         """Test starting review session with no available cards"""
-        mock_callback.data = "start_session_123"
-
-        with patch("memorius.handlers.user.session.CardRepository") as mock_card_repo_class:
+        with (
+            patch("memorius.handlers.user.session.CardRepository") as mock_card_repo_class,
+            patch("memorius.handlers.user.session.ReviewRepository") as mock_review_repo_class,
+        ):
             mock_card_repo = AsyncMock()
-            mock_card_repo.get_cards_for_review = AsyncMock(return_value=[])
+            mock_card_repo.get_first_due_card = AsyncMock(return_value=None)
             mock_card_repo_class.return_value = mock_card_repo
-
-            await start_session(mock_callback, mock_state, mock_session, mock_locale)
+            mock_review_repo_class.return_value.get_review_budget = AsyncMock(return_value=(200, 20))
+
+            await start_session(
+                mock_callback,
+                DeckCallback(action=DeckAction.START_SESSION, deck_id=123),
+                mock_state,
+                mock_session,
+                mock_locale,
+            )
 
             mock_state.set_state.assert_not_called()
             mock_callback.answer.assert_called_once()
+            mock_locale.all_cards_reviewed.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_start_session_daily_limit(self, mock_callback, mock_state, mock_session, mock_locale):
+        """Test that the daily limit is reported only when it holds back due cards"""
+        with (
+            patch("memorius.handlers.user.session.CardRepository") as mock_card_repo_class,
+            patch("memorius.handlers.user.session.ReviewRepository") as mock_review_repo_class,
+        ):
+            mock_card_repo = AsyncMock()
+            mock_card_repo.get_first_due_card = AsyncMock(return_value=None)
+            mock_card_repo_class.return_value = mock_card_repo
+            mock_review_repo_class.return_value.get_review_budget = AsyncMock(return_value=(0, 0))
+            callback_data = DeckCallback(action=DeckAction.START_SESSION, deck_id=123)
+
+            mock_card_repo.get_due_cards = AsyncMock(return_value=[])
+            await start_session(mock_callback, callback_data, mock_state, mock_session, mock_locale)
+            mock_locale.all_cards_reviewed.assert_called_once()
+
+            mock_card_repo.get_due_cards = AsyncMock(return_value=[MagicMock()])
+            await start_session(mock_callback, callback_data, mock_state, mock_session, mock_locale)
+            mock_locale.daily_limit_reached.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_show_answer(self, mock_callback, mock_state, mock_session, mock_locale, mock_keyboard):
         """Test showing answer to current card"""
-        mock_state.get_data = AsyncMock(return_value={"cards": [1, 2, 3], "current_index": 0})
+        mock_state.get_data = AsyncMock(return_value={"card_id": 1, "position": 1, "total": 3})
 
         with (
             patch("memorius.handlers.user.session.CardRepository") as mock_card_repo_class,
@@ -488,9 +555,15 @@ class TestSessionHandlers:
             mock_card_repo.get_card_by_id = AsyncMock(return_value=mock_card)
             mock_card_repo_class.return_value = mock_card_repo
 
-            await show_answer(mock_callback, mock_state, mock_session, mock_locale)
+            await show_answer(
+                mock_callback,
+                ReviewCallback(action=ReviewAction.SHOW_ANSWER, card_id=1),
+                mock_state,
+                mock_session,
+                mock_locale,
+            )
 
-            mock_cancel.assert_called_once()
+            mock_cancel.assert_not_called()
             mock_callback.message.edit_text.assert_called_once()
             mock_timeout.assert_called_once()
 
@@ -499,8 +572,9 @@ class TestSessionHandlers:
         """Test skipping a card"""
         mock_state.get_data = AsyncMock(
             return_value={
-                "cards": [1, 2, 3],
-                "current_index": 0,
+                "card_id": 1,
+                "position": 1,
+                "total": 3,
                 "deck_id": 123,
                 "skipped": 0,
                 "easy": 0,
@@ -518,53 +592,123 @@ class TestSessionHandlers:
             mock_stats_repo.add_statistics = AsyncMock()
             mock_stats_repo_class.return_value = mock_stats_repo
 
-            await skip_card(mock_callback, mock_state, mock_session, mock_locale)
+            await skip_card(
+                mock_callback,
+                ReviewCallback(action=ReviewAction.SKIP, card_id=1),
+                mock_state,
+                mock_session,
+                mock_locale,
+            )
 
             mock_cancel.assert_called_once()
             mock_stats_repo.add_statistics.assert_called_once()
             mock_state.update_data.assert_called_once()
             mock_next.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_skip_card_stale_tap(self, mock_callback, mock_state, mock_session, mock_locale):
+        """Test that a repeated Skip tap does not skip the card after the one it was shown for"""
+        mock_state.get_data = AsyncMock(return_value={"card_id": 2, "deck_id": 123, "skipped": 1})
+
+        with (
+            patch("memorius.handlers.user.session.StatisticsRepository") as mock_stats_repo_class,
+            patch("memorius.handlers.user.session.cancel_timeout") as mock_cancel,
+            patch("memorius.handlers.user.session.next_card") as mock_next,
+        ):
+            await skip_card(
+                mock_callback,
+                ReviewCallback(action=ReviewAction.SKIP, card_id=1),
+                mock_state,
+                mock_session,
+                mock_locale,
+            )
+
+            mock_cancel.assert_not_called()
+            mock_stats_repo_class.assert_not_called()
+            mock_state.update_data.assert_not_called()
+            mock_next.assert_not_called()
+            mock_callback.answer.assert_called_once_with(mock_locale.button_expired())
+
     @pytest.mark.asyncio
     async def test_rate_difficulty(self, mock_callback, mock_state, mock_session, mock_locale):
         """Test rating answer difficulty"""
-        mock_callback.data = "difficulty_easy"
         mock_state.get_data = AsyncMock(
-            return_value={"cards": [1, 2, 3], "current_index": 0, "deck_id": 123, "easy": 0, "medium": 0, "hard": 0}
+            return_value={"card_id": 1, "position": 1, "total": 3, "deck_id": 123, "easy": 0, "medium": 0, "hard": 0}
         )
 
         with (
-            patch("memorius.handlers.user.session.CardRepository") as mock_card_repo_class,
-            patch("memorius.handlers.user.session.StatisticsRepository") as mock_stats_repo_class,
+            patch("memorius.handlers.user.session.ReviewRepository") as mock_review_repo_class,
             patch("memorius.handlers.user.session.cancel_timeout") as mock_cancel,
             patch("memorius.handlers.user.session.next_card") as mock_next,
         ):
-            mock_card_repo = AsyncMock()
-            mock_card_repo.update_card_review = AsyncMock()
-            mock_card_repo_class.return_value = mock_card_repo
+            mock_review_repo = AsyncMock()
+            mock_review_repo.grade_card = AsyncMock()
+            mock_review_repo_class.return_value = mock_review_repo
 
-            mock_stats_repo = AsyncMock()
-            mock_stats_repo.add_statistics = AsyncMock()
-            mock_stats_repo_class.return_value = mock_stats_repo
-
-            await rate_difficulty(mock_callback, mock_state, mock_session, mock_locale)
+            await rate_difficulty(
+                mock_callback, GradeCallback(difficulty="easy", card_id=1), mock_state, mock_session, mock_locale
+            )
 
             mock_cancel.assert_called_once()
-            mock_card_repo.update_card_review.assert_called_once()
-            mock_stats_repo.add_statistics.assert_called_once()
+            mock_review_repo.grade_card.assert_called_once_with(
+                card_id=1, user_id=123456789, difficulty="easy", due_by=None
+            )
             mock_next.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_rate_difficulty_stale_tap(self, mock_callback, mock_state, mock_session, mock_locale):
+        """Test that a grade tapped for a card the session has moved past is rejected"""
+        mock_state.get_data = AsyncMock(return_value={"card_id": 2, "deck_id": 123, "easy": 0})
+
+        with (
+            patch("memorius.handlers.user.session.ReviewRepository") as mock_review_repo_class,
+            patch("memorius.handlers.user.session.cancel_timeout") as mock_cancel,
+        ):
+            await rate_difficulty(
+                mock_callback, GradeCallback(difficulty="easy", card_id=1), mock_state, mock_session, mock_locale
+            )
+
+            mock_cancel.assert_not_called()
+            mock_review_repo_class.assert_not_called()
+            mock_callback.answer.assert_called_once_with(mock_locale.button_expired())
+
+    @pytest.mark.asyncio
+    async def test_rate_difficulty_graded_elsewhere(self, mock_callback, mock_state, mock_session, mock_locale):
+        """Test that a grade losing the race to another worker or the timeout leaves the session alone"""
+        mock_state.get_data = AsyncMock(
+            return_value={"card_id": 1, "until": "2026-01-02T10:00:00", "deck_id": 123, "easy": 0}
+        )
+
+        with (
+            patch("memorius.handlers.user.session.ReviewRepository") as mock_review_repo_class,
+            patch("memorius.handlers.user.session.CardRepository") as mock_card_repo_class,
+            patch("memorius.handlers.user.session.cancel_timeout") as mock_cancel,
+            patch("memorius.handlers.user.session.next_card") as mock_next,
+        ):
+            mock_review_repo_class.return_value.grade_card = AsyncMock(return_value=None)
+            mock_card_repo_class.return_value.get_card_by_id = AsyncMock(return_value=MagicMock())
+
+            await rate_difficulty(
+                mock_callback, GradeCallback(difficulty="easy", card_id=1), mock_state, mock_session, mock_locale
+            )
+
+            mock_review_repo_class.return_value.grade_card.assert_called_once_with(
+                card_id=1, user_id=123456789, difficulty="easy", due_by=datetime(2026, 1, 2, 10)
+            )
+            mock_cancel.assert_not_called()
+            mock_next.assert_not_called()
+            mock_state.update_data.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_check_variant_answer_correct(self, mock_callback, mock_state, mock_session, mock_locale):
         """Test checking correct variant answer"""
-        mock_callback.data = "variant_answer_1"
         mock_state.get_data = AsyncMock(
-            return_value={"cards": [1, 2, 3], "current_index": 0, "deck_id": 123, "easy": 0, "medium": 0, "hard": 0}
+            return_value={"card_id": 1, "position": 1, "total": 3, "deck_id": 123, "easy": 0, "medium": 0, "hard": 0}
         )
 
         with (
             patch("memorius.handlers.user.session.CardRepository") as mock_card_repo_class,
-            patch("memorius.handlers.user.session.StatisticsRepository") as mock_stats_repo_class,
+            patch("memorius.handlers.user.session.ReviewRepository") as mock_review_repo_class,
             patch("memorius.handlers.user.session.cancel_timeout") as mock_cancel,
             patch("memorius.handlers.user.session.next_card") as mock_next,
         ):
@@ -575,20 +719,316 @@ class TestSessionHandlers:
 
             mock_card_repo = AsyncMock()
             mock_card_repo.get_card_by_id = AsyncMock(return_value=mock_card)
-            mock_card_repo.update_card_review = AsyncMock()
             mock_card_repo_class.return_value = mock_card_repo
 
-            mock_stats_repo = AsyncMock()
-            mock_stats_repo.add_statistics = AsyncMock()
-            mock_stats_repo_class.return_value = mock_stats_repo
+            mock_review_repo = AsyncMock()
+            mock_review_repo.grade_card = AsyncMock()
+            mock_review_repo_class.return_value = mock_review_repo
 
-            await check_variant_answer(mock_callback, mock_state, mock_session, mock_locale)
+            await check_variant_answer(
+                mock_callback, VariantCallback(variant=1, card_id=1), mock_state, mock_session, mock_locale
+            )
 
             mock_cancel.assert_called_once()
-            mock_card_repo.update_card_review.assert_called_once()
-            mock_stats_repo.add_statistics.assert_called_once()
+            mock_review_repo.grade_card.assert_called_once_with(
+                card_id=1, user_id=123456789, difficulty="easy", due_by=None
+            )
             mock_next.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_next_card_advances_cursor(self, mock_callback, mock_state, mock_session, mock_locale, mock_keyboard):
+        """Test that the next due card is fetched after the stored cursor and only the cursor is saved"""
+        mock_state.get_data = AsyncMock(
+            return_value={
+                "deck_id": 123,
+                "card_id": 1,
+                "cursor": ["2026-01-01T10:00:00", 1],
+                "until": "2026-01-02T10:00:00",
+                "position": 1,
+                "total": 3,
+                "reviews_left": 200,
+                "new_left": 0,
+            }
+        )
+
+        with (
+            patch("memorius.handlers.user.session.card_prefetcher") as mock_prefetcher,
+            patch("memorius.handlers.user.session.start_timeout") as mock_timeout,
+            patch("memorius.handlers.user.session.get_review_keyboard", return_value=mock_keyboard),
+        ):
+            mock_card = MagicMock()
+            mock_card.id = 2
+            mock_card.card_type = "text"
+            mock_card.question = "Test question"
+            mock_card.next_review = datetime(2026, 1, 1, 11)
+            mock_card.first_reviewed_at = datetime(2025, 12, 1)
+
+            mock_prefetcher.next = AsyncMock(return_value=mock_card)
+
+            await next_card(mock_callback, mock_state, mock_session, mock_locale)
+
+            mock_prefetcher.next.assert_called_once_with(
+                123456789, 123, datetime(2026, 1, 2, 10), (datetime(2026, 1, 1, 10), 1), new=False
+            )
+            mock_state.update_data.assert_called_once_with(
+                card_id=2, cursor=["2026-01-01T11:00:00", 2], position=2, reviews_left=199
+            )
+            mock_timeout.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_stale_deadline_ignored(self, mock_state, mock_session, mock_locale):
+        """Test that a deadline set for a card the user already answered does not grade the current one"""
+        mock_state.get_state = AsyncMock(return_value=ReviewSession.in_session)
+        mock_state.get_data = AsyncMock(return_value={"deck_id": 123, "card_id": 2})
+
+        with patch("memorius.handlers.user.session.ReviewRepository") as mock_review_repo_class:
+            await _expire_card(123, 123, 10, 1, mock_state, mock_session, mock_locale, AsyncMock())
+
+            mock_review_repo_class.assert_not_called()
+
+
+class TestTranslateMiddleware:
+    """Tests for locale resolution middleware"""
+
+    @pytest.mark.asyncio
+    async def test_cached_profile_skips_database(self, mock_user, mock_session):
+        """Test that a cached profile resolves the locale without a query"""
+        user_profile_cache.set(mock_user.id, UserProfile(language_code="en", phone_number=None))
+        t_hub = MagicMock()
+        handler = AsyncMock()
+
+        with patch("memorius.middlewares.translate.UserRepository") as mock_user_repo_class:
+            await TranslateMiddleware()(
+                handler, MagicMock(), {"event_from_user": mock_user, "session": mock_session, "t_hub": t_hub}
+            )
+
+            mock_user_repo_class.assert_not_called()
+            t_hub.get_translator_by_locale.assert_called_once_with("en")
+            handler.assert_called_once()
+
+        user_profile_cache.pop(mock_user.id)
+
+    @pytest.mark.asyncio
+    async def test_cache_miss_registers_user(self, mock_user, mock_session):
+        """Test that an unknown user is upserted once and the locale comes from the stored profile"""
+        user_profile_cache.pop(mock_user.id)
+        t_hub = MagicMock()
+
+        async def get_or_create_user(user_id, **kwargs):
+            user_profile_cache.set(user_id, UserProfile(language_code="ru", phone_number=None))
+
+        with patch("memorius.middlewares.translate.UserRepository") as mock_user_repo_class:
+            mock_user_repo = AsyncMock()
+            mock_user_repo.get_or_create_user = AsyncMock(side_effect=get_or_create_user)
+            mock_user_repo_class.return_value = mock_user_repo
+
+            await TranslateMiddleware()(
+                AsyncMock(), MagicMock(), {"event_from_user": mock_user, "session": mock_session, "t_hub": t_hub}
+            )
+
+            mock_user_repo.get_or_create_user.assert_called_once()
+            t_hub.get_translator_by_locale.assert_called_once_with("ru")
+
+        user_profile_cache.pop(mock_user.id)
+
+
+class TestBufferedStateMiddleware:
+    """Tests for per-update write-back FSM context"""
+
+    @pytest.mark.asyncio
+    async def test_state_loaded_once_and_written_back_once(self):
+        """Test that repeated reads and updates within one update hit the storage once each way"""
+        storage = AsyncMock()
+        storage.get_data.return_value = {"current_index": 0, "easy": 0}
+        context = FSMContext(storage=storage, key=MagicMock())
+
+        async def handler(event, data):
+            state = data["state"]
+            assert await state.get_state() == ReviewSession.in_session.state
+            await state.update_data(easy=(await state.get_data())["easy"] + 1)
+            await state.update_data(current_index=(await state.get_data())["current_index"] + 1)
+
+        await BufferedStateMiddleware()(
+            handler, MagicMock(), {"state": context, "raw_state": ReviewSession.in_session.state}
+        )
+
+        storage.get_state.assert_not_called()
+        storage.get_data.assert_called_once()
+        storage.set_state.assert_not_called()
+        storage.set_data.assert_called_once_with(key=context.key, data={"current_index": 1, "easy": 1})
+
+    @pytest.mark.asyncio
+    async def test_clear_written_back(self):
+        """Test that clearing the state writes both state and data once"""
+        storage = AsyncMock()
+        context = FSMContext(storage=storage, key=MagicMock())
+
+        async def handler(event, data):
+            await data["state"].clear()
+
+        await BufferedStateMiddleware()(handler, MagicMock(), {"state": context, "raw_state": None})
+
+        storage.get_data.assert_not_called()
+        storage.set_state.assert_called_once_with(key=context.key, state=None)
+        storage.set_data.assert_called_once_with(key=context.key, data={})
+
+
+class TestThrottlingRequestMiddleware:
+    """Tests for the outgoing request limiter"""
+
+    @pytest.mark.asyncio
+    async def test_requests_without_chat_pass_through(self):
+        """Test that requests not addressed to a chat are neither throttled nor retried"""
+        throttle = ThrottlingRequestMiddleware(global_rate=1, chat_rate=1, chat_burst=1)
+        throttle.global_bucket.tokens = 0
+        make_request = AsyncMock(return_value="ok")
+
+        result = await asyncio.wait_for(throttle(make_request, MagicMock(), MagicMock(spec=[])), 0.1)
+
+        assert result == "ok"
+
+    @pytest.mark.asyncio
+    async def test_chat_bucket_limits_bursts(self):
+        """Test that a chat gets its burst at once and then one request per token"""
+        throttle = ThrottlingRequestMiddleware(global_rate=1000, chat_rate=1, chat_burst=2)
+
+        await asyncio.wait_for(throttle.acquire(123), 0.1)
+        await asyncio.wait_for(throttle.acquire(123), 0.1)
+        await asyncio.wait_for(throttle.acquire(456), 0.1)
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(throttle.acquire(123), 0.1)
+
+    @pytest.mark.asyncio
+    async def test_retry_after_honoured(self):
+        """Test that a flood wait is slept off and the request sent again"""
+        throttle = ThrottlingRequestMiddleware(chat_burst=5)
+        method = SendMessage(chat_id=123, text="hi")
+        make_request = AsyncMock(side_effect=[TelegramRetryAfter(method, "Flood", retry_after=0), "ok"])
+
+        assert await throttle(make_request, MagicMock(), method) == "ok"
+        assert make_request.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_exhausted(self):
+        """Test that the flood wait error surfaces once retries run out"""
+        throttle = ThrottlingRequestMiddleware(chat_burst=5, retries=1)
+        method = SendMessage(chat_id=123, text="hi")
+        make_request = AsyncMock(side_effect=TelegramRetryAfter(method, "Flood", retry_after=0))
+
+        with pytest.raises(TelegramRetryAfter):
+            await throttle(make_request, MagicMock(), method)
+        assert make_request.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_bulk_gives_way_to_interactive(self):
+        """Test that a queued interactive request goes before a bulk one waiting on the global limit"""
+        throttle = ThrottlingRequestMiddleware(global_rate=20, chat_burst=5)
+        throttle.global_bucket.tokens = 0
+        order = []
+
+        async def send(chat_id, name, bulk=False):
+            if bulk:
+                with bulk_sends():
+                    await throttle.acquire(chat_id)
+            else:
+                await throttle.acquire(chat_id)
+            order.append(name)
+
+        await asyncio.gather(send(1, "bulk", bulk=True), send(2, "interactive"))
+
+        assert order == ["interactive", "bulk"]
+
+
+class TestMenuDispatch:
+    """Tests for locale-independent main menu matching"""
+
+    def test_index_covers_every_language(self):
+        with patch("memorius.i18n.hub.compile_messages") as compile_messages:
+            index = build_menu_index(("ru", "en"))
+
+        compile_messages.assert_not_called()
+
+        assert index["📚 Мои колоды"] == index["📚 My decks"] == "my_decks"
+        assert index["🌐 Язык"] == index["🌐 Language"] == "language"
+        assert len(index) == 10
+
+    @pytest.mark.asyncio
+    async def test_middleware_injects_action_for_filter(self, mock_message):
+        middleware = MenuMiddleware({"📊 Statistics": "statistics"})
+        seen = {}
+
+        async def handler(event, data):
+            seen.update(data)
+
+        mock_message.text = "📊 Statistics"
+        await middleware(handler, mock_message, {})
+        assert await MenuFilter("statistics")(mock_message, **seen)
+        assert not await MenuFilter("help")(mock_message, **seen)
+
+        mock_message.text = "statistics please"
+        await middleware(handler, mock_message, {})
+        assert seen["menu_action"] is None
+
+
+class TestCallbackDispatch:
+    """Tests for prefix-indexed callback data"""
+
+    @pytest.mark.asyncio
+    async def test_middleware_unpacks_once_for_filters(self, mock_callback):
+        middleware = CallbackDataMiddleware(build_callback_index())
+        seen = {}
+
+        async def handler(event, data):
+            seen.update(data)
+
+        mock_callback.data = DeckCallback(action=DeckAction.DELETE, deck_id=42).pack()
+        await middleware(handler, mock_callback, {})
+
+        assert seen["callback_data"] == DeckCallback(action=DeckAction.DELETE, deck_id=42)
+        assert callback_table.resolve(seen["callback_data"]).callback is delete_deck_confirm
+        assert callback_table.resolve(DeckCallback(action=DeckAction.SHOW, deck_id=42)).callback is show_deck_actions
+        assert callback_table.resolve(None) is None
+
+    @pytest.mark.asyncio
+    async def test_unknown_or_malformed_data_matches_nothing(self, mock_callback):
+        middleware = CallbackDataMiddleware(build_callback_index())
+        seen = {}
+
+        async def handler(event, data):
+            seen.update(data)
+
+        # "g:easy" is a grade button from before grades carried the card id
+        for data in ("delete_deck_42", "d:x", "d:zz:42", "g:impossible", "g:easy"):
+            mock_callback.data = data
+            await middleware(handler, mock_callback, {})
+            assert seen["callback_data"] is None
+
+    @pytest.mark.asyncio
+    async def test_unhandled_callback_answered(self, mock_callback, mock_locale):
+        await expired_button(mock_callback, mock_locale)
+
+        mock_callback.answer.assert_called_once_with(mock_locale.button_expired())
+
+    @pytest.mark.asyncio
+    async def test_dispatch_routes_by_table(self, mock_callback, mock_locale):
+        callback_data = DeckCallback(action=DeckAction.SHOW, deck_id=42)
+        handler = callback_table.resolve(callback_data)
+        with patch.object(handler, "call", AsyncMock()) as mock_call:
+            await dispatch_callback(mock_callback, callback_data=callback_data, locale=mock_locale)
+
+        mock_call.assert_called_once_with(mock_callback, callback_data=callback_data, locale=mock_locale)
+        mock_callback.answer.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_dispatch_expires_when_filters_fail(self, mock_callback, mock_locale):
+        # A grade tap after the session state is gone resolves a handler whose state filter fails
+        callback_data = GradeCallback(difficulty="easy", card_id=1)
+        await dispatch_callback(mock_callback, callback_data=callback_data, raw_state=None, locale=mock_locale)
+        await dispatch_callback(mock_callback, callback_data=None, locale=mock_locale)
+
+        assert mock_callback.answer.call_count == 2
+        mock_callback.answer.assert_called_with(mock_locale.button_expired())
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,273 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.methods import EditMessageText
+from aiogram.types import Chat, InaccessibleMessage, InlineKeyboardButton, InlineKeyboardMarkup
+from fluent_compiler.bundle import FluentBundle
+from fluentogram import FluentTranslator, TranslatorRunner
+
+from memorius.i18n import CompiledBundle, LazyTranslatorHub
+from memorius.keyboards import get_cancel_keyboard, get_deck_actions_keyboard
+from memorius.utils import DeckAction, DeckCallback
+from memorius.utils.cache import TTLCache
+from memorius.utils.editor import MessageEditor
+from memorius.utils.isolation import UserEventIsolation
+from memorius.utils.timer_wheel import TimerWheel
+
+
+class TestTTLCache:
+    """Tests for the in-process TTL/LRU cache"""
+
+    def test_get_and_set(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("missing", "default") == "default"
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert len(cache) == 2
+
+    def test_entries_expire(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        with patch("memorius.utils.cache.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("memorius.utils.cache.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestTimerWheel:
+    """Tests for the shared timeout scheduler"""
+
+    @pytest.mark.asyncio
+    async def test_fires_after_delay(self):
+        wheel = TimerWheel(tick=0.01, slots=4)
+        fired = asyncio.Event()
+
+        async def callback():
+            fired.set()
+
+        wheel.schedule("user", 0.05, callback)
+
+        await asyncio.wait_for(fired.wait(), timeout=1)
+        assert "user" not in wheel
+        await wheel.stop()
+
+    @pytest.mark.asyncio
+    async def test_cancel_and_reschedule(self):
+        wheel = TimerWheel(tick=0.01, slots=4)
+        calls = []
+
+        async def callback(name):
+            calls.append(name)
+
+        wheel.schedule("a", 0.02, lambda: callback("a"))
+        wheel.schedule("b", 0.02, lambda: callback("b"))
+        wheel.schedule("b", 0.02, lambda: callback("b2"))
+
+        assert wheel.cancel("a") is True
+        assert wheel.cancel("a") is False
+        assert len(wheel) == 1
+
+        await asyncio.sleep(0.1)
+        assert calls == ["b2"]
+        await wheel.stop()
+
+    @pytest.mark.asyncio
+    async def test_delay_longer_than_one_rotation(self):
+        wheel = TimerWheel(tick=0.01, slots=2)
+        loop = asyncio.get_running_loop()
+        fired = loop.create_future()
+
+        async def callback():
+            fired.set_result(loop.time())
+
+        started = loop.time()
+        wheel.schedule("user", 0.08, callback)
+
+        assert await asyncio.wait_for(fired, timeout=1) - started >= 0.07
+        await wheel.stop()
+
+
+class TestUserEventIsolation:
+    """Tests for per-user update serialization"""
+
+    @pytest.mark.asyncio
+    async def test_serializes_same_user_and_drops_idle_locks(self):
+        isolation = UserEventIsolation()
+        key = StorageKey(bot_id=1, chat_id=1, user_id=1)
+        order = []
+
+        async def handle(name, delay):
+            async with isolation.lock(key):
+                order.append(f"{name} start")
+                await asyncio.sleep(delay)
+                order.append(f"{name} end")
+
+        await asyncio.gather(handle("first", 0.02), handle("second", 0))
+
+        assert order == ["first start", "first end", "second start", "second end"]
+        assert len(isolation) == 0
+
+    @pytest.mark.asyncio
+    async def test_different_users_run_concurrently(self):
+        isolation = UserEventIsolation()
+        both_inside = asyncio.Barrier(2)
+
+        async def handle(user_id):
+            async with isolation.lock(StorageKey(bot_id=1, chat_id=user_id, user_id=user_id)):
+                await asyncio.wait_for(both_inside.wait(), timeout=1)
+
+        await asyncio.gather(handle(1), handle(2))
+        assert len(isolation) == 0
+
+
+def keyboard(label: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text=label, callback_data=label)]])
+
+
+class TestMessageEditor:
+    """Tests for change-only message edits"""
+
+    @pytest.mark.asyncio
+    async def test_skips_identical_and_sends_markup_only(self):
+        editor = MessageEditor()
+        bot = AsyncMock()
+
+        await editor.edit(bot, 1, 10, "question", keyboard("a"))
+        await editor.edit(bot, 1, 10, "question", keyboard("a"))
+        await editor.edit(bot, 1, 10, "question", keyboard("b"))
+
+        bot.edit_message_text.assert_awaited_once_with(
+            chat_id=1, message_id=10, text="question", reply_markup=keyboard("a")
+        )
+        bot.edit_message_reply_markup.assert_awaited_once_with(chat_id=1, message_id=10, reply_markup=keyboard("b"))
+
+    @pytest.mark.asyncio
+    async def test_not_modified_suppressed_other_errors_raised(self):
+        editor = MessageEditor()
+        bot = AsyncMock()
+        method = EditMessageText(text="question")
+
+        bot.edit_message_text.side_effect = TelegramBadRequest(method, "Bad Request: message is not modified")
+        await editor.edit(bot, 1, 10, "question")
+
+        bot.edit_message_text.side_effect = TelegramBadRequest(method, "Bad Request: message to edit not found")
+        with pytest.raises(TelegramBadRequest):
+            await editor.edit(bot, 1, 10, "answer")
+
+    @pytest.mark.asyncio
+    async def test_coalesces_queued_edits(self):
+        editor = MessageEditor()
+        bot = AsyncMock()
+        release = asyncio.Event()
+
+        async def slow_edit(**kwargs):
+            await release.wait()
+
+        bot.edit_message_text.side_effect = slow_edit
+        first = asyncio.create_task(editor.edit(bot, 1, 10, "first"))
+        await asyncio.sleep(0)
+        queued = [asyncio.create_task(editor.edit(bot, 1, 10, text)) for text in ("second", "third")]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *queued)
+
+        assert [call.kwargs["text"] for call in bot.edit_message_text.await_args_list] == ["first", "third"]
+
+    @pytest.mark.asyncio
+    async def test_inaccessible_message_edited_by_id(self):
+        editor = MessageEditor()
+        bot = AsyncMock()
+        message = InaccessibleMessage(chat=Chat(id=1, type="private"), message_id=10).as_(bot)
+
+        await editor.edit(bot, 1, 10, "question")
+        await editor.edit_message(message, "question")
+
+        assert bot.edit_message_text.await_count == 2
+
+
+def runner(locale: str, cancel: str) -> TranslatorRunner:
+    bundle = FluentBundle.from_string(
+        locale,
+        f"""
+btn_cancel = {cancel}
+btn_open_deck = Open
+btn_start_session = Start
+btn_add_card = Add
+btn_edit_card = Edit
+btn_delete_card = Delete
+btn_delete_deck = Delete deck
+btn_back_to_decks = Back
+""",
+    )
+    return TranslatorRunner(translators=[FluentTranslator(locale=locale, translator=bundle)])
+
+
+class TestKeyboardCache:
+    """Tests for per-locale keyboard reuse"""
+
+    def test_static_keyboard_built_once_per_locale(self):
+        en, ru = runner("en", "Cancel"), runner("ru", "Отмена")
+
+        markup = get_cancel_keyboard(en)
+
+        assert get_cancel_keyboard(runner("en", "Cancel")) is markup
+        assert get_cancel_keyboard(ru) is not markup
+        assert get_cancel_keyboard(ru).inline_keyboard[0][0].text == "Отмена"
+
+    def test_deck_actions_memoized_per_arguments(self):
+        en = runner("en", "Cancel")
+
+        markup = get_deck_actions_keyboard(1, True, en)
+
+        assert get_deck_actions_keyboard(1, True, en) is markup
+        assert get_deck_actions_keyboard(1, False, en) is not markup
+        assert (
+            get_deck_actions_keyboard(2, True, en).inline_keyboard[1][0].callback_data
+            == DeckCallback(action=DeckAction.START_SESSION, deck_id=2).pack()
+        )
+
+
+class TestLazyTranslatorHub:
+    """Tests for packaged, lazily compiled translations"""
+
+    def make_hub(self, cache_dir) -> LazyTranslatorHub:
+        return LazyTranslatorHub(
+            locales_map={"ru": ("ru", "en"), "en": ("en",)},
+            bundle_locales={"ru": "ru-RU", "en": "en-US"},
+            cache_dir=cache_dir,
+        )
+
+    def test_locale_compiled_on_first_use(self, tmp_path):
+        hub = self.make_hub(tmp_path)
+        assert not hub.storage.has_translator("ru")
+        assert len(list(tmp_path.iterdir())) == 1
+
+        locale = hub.get_translator_by_locale("ru")
+
+        assert hub.storage.has_translator("ru")
+        assert [translator.locale for translator in locale.translators] == ["ru", "en"]
+        assert hub.get_translator_by_locale("de").translators[0].locale == "en"
+        assert len(list(tmp_path.iterdir())) == 2
+
+    def test_cached_bundle_renders_the_same(self, tmp_path):
+        compiled = self.make_hub(tmp_path).get_translator_by_locale("ru")
+        cached = self.make_hub(tmp_path).get_translator_by_locale("ru")
+
+        assert isinstance(cached.translators[0].translator, CompiledBundle)
+        for args in ({"current": 1, "total": 21}, {"current": 2, "total": 5}):
+            assert cached.question_number(**args) == compiled.question_number(**args)
+        assert cached.btn_show_answer() == compiled.btn_show_answer()
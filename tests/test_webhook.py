@@ -0,0 +1,95 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram import Dispatcher
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from memorius.webhook import BoundedRequestHandler
+
+
+@pytest.fixture
+def bot():
+    """Create mock bot with a JSON-capable session"""
+    bot = MagicMock()
+    bot.session.json_loads = json.loads
+    bot.session.json_dumps = json.dumps
+    bot.session.close = AsyncMock()
+    return bot
+
+
+async def make_client(handler: BoundedRequestHandler) -> TestClient:
+    app = web.Application()
+    handler.register(app, path="/webhook")
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    return client
+
+
+class TestBoundedRequestHandler:
+    """Tests for the webhook request handler"""
+
+    @pytest.mark.asyncio
+    async def test_rejects_wrong_secret(self, bot):
+        """Test that requests without the configured secret token are refused"""
+        dp = MagicMock(spec=Dispatcher)
+        dp.feed_webhook_update = AsyncMock(return_value=None)
+        client = await make_client(BoundedRequestHandler(dp, bot, max_in_flight=1, secret_token="s3cret"))
+
+        response = await client.post("/webhook", json={"update_id": 1})
+        assert response.status == 401
+
+        response = await client.post(
+            "/webhook", json={"update_id": 1}, headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"}
+        )
+        assert response.status == 200
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_limits_updates_in_flight(self, bot):
+        """Test that a request beyond the limit is processed only after a running update finishes"""
+        release = asyncio.Event()
+        dp = MagicMock(spec=Dispatcher)
+
+        async def feed_webhook_update(*args, **kwargs):
+            await release.wait()
+
+        dp.feed_webhook_update = AsyncMock(side_effect=feed_webhook_update)
+        client = await make_client(BoundedRequestHandler(dp, bot, max_in_flight=1))
+
+        first = asyncio.create_task(client.post("/webhook", json={"update_id": 1}))
+        second = asyncio.create_task(client.post("/webhook", json={"update_id": 2}))
+        await asyncio.sleep(0.05)
+        assert dp.feed_webhook_update.await_count == 1
+
+        release.set()
+        assert [(await first).status, (await second).status] == [200, 200]
+        assert dp.feed_webhook_update.await_count == 2
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_rejects_wrong_secret_while_saturated(self, bot):
+        """Test that a forged request is refused at once instead of waiting for a slot"""
+        release = asyncio.Event()
+        dp = MagicMock(spec=Dispatcher)
+
+        async def feed_webhook_update(*args, **kwargs):
+            await release.wait()
+
+        dp.feed_webhook_update = AsyncMock(side_effect=feed_webhook_update)
+        client = await make_client(BoundedRequestHandler(dp, bot, max_in_flight=1, secret_token="s3cret"))
+        headers = {"X-Telegram-Bot-Api-Secret-Token": "s3cret"}
+
+        running = asyncio.create_task(client.post("/webhook", json={"update_id": 1}, headers=headers))
+        await asyncio.sleep(0.05)
+        forged = await asyncio.wait_for(
+            client.post("/webhook", json={"update_id": 2}, headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"}), 1
+        )
+        assert forged.status == 401
+        assert dp.feed_webhook_update.await_count == 1
+
+        release.set()
+        assert (await running).status == 200
+        await client.close()